@@ -1,11 +1,14 @@
-from jose import JWTError
 from loguru import logger
 from fastapi import APIRouter, Depends
 from fastapi.responses import ORJSONResponse
 
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
 from app.models.mysql import User
 from app.core.config import settings
-from app.db.connection import MySqlSession
+from app.db.dep import get_async_db
+from app.auth.jwt_backend import TokenError
 from app.auth.jwt import RequireRefreshToken, RequireJWT, create_jwt
 
 from app.types.jwt import TokenData, JWTPayload
@@ -15,36 +18,36 @@ router = APIRouter(prefix='/auth')
 
 
 @router.get('/signup')
-async def signup() -> ServerResponse[str]:
+async def signup(session: AsyncSession = Depends(get_async_db)) -> ServerResponse[str]:
     """
         Example route to create a user.
     """
-    with MySqlSession() as session:
-        user = User()
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+    user = User()
+    session.add(user)
+    await session.commit()
+    await session.refresh(user)
 
     return ServerResponse()
 
 
 @router.get('/login')
-async def login(response: ORJSONResponse) -> ServerResponse[str]:
+async def login(
+    response: ORJSONResponse, session: AsyncSession = Depends(get_async_db)
+) -> ServerResponse[str]:
     """
         Example route to login a user. Will just grab the first user from the database
         and create a JWT for them.
     """
     # Grab the first user from the database
-    with MySqlSession() as session:
-        user = session.query(User).first()
+    user = (await session.scalars(select(User).limit(1))).first()
 
     if not user:
         return ServerResponse(status='error', message='No user found')
 
     token = TokenData(sub=str(user.id))
     try:
-        accessToken, refreshToken = create_jwt(token)
-    except JWTError as e:
+        accessToken, refreshToken = await create_jwt(token)
+    except TokenError as e:
         logger.error(f'JWT Error during login: {e}')
         return ServerResponse(status='error', message='JWT Error, try again')
 
@@ -69,8 +72,8 @@ async def refresh(
     token = TokenData(sub=payload.sub)
 
     try:
-        accessToken, refreshToken = create_jwt(token)
-    except JWTError as e:
+        accessToken, refreshToken = await create_jwt(token)
+    except TokenError as e:
         logger.error(f'JWT Error during login: {e}')
         return ServerResponse(status='error', message='JWT Error, try again.')
 
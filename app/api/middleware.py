@@ -1,72 +1,140 @@
+import hmac
+
 from loguru import logger
-from typing import Callable
-from fastapi import Request
-# from pyinstrument import Profiler
+from pyinstrument import Profiler
 from app.core.config import settings
+from app.api.profiling import ProfileStore, UNMATCHED_ROUTE
+from starlette.datastructures import Headers, QueryParams
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.exc import IntegrityError
 from app.types.server import ServerResponse
 from fastapi.responses import ORJSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from sqlalchemy.exc import NoResultFound, MultipleResultsFound
 
 
-class DBExceptionsMiddleware(BaseHTTPMiddleware):
+class ErrorMappingMiddleware:
     """
-        Middleware to catch and handle database exceptions.
+        Pure ASGI middleware that turns exceptions raised by the app into an error
+        `ServerResponse`. Unlike `BaseHTTPMiddleware` it doesn't wrap the request and
+        response in extra tasks and streams, so streaming responses and contextvars
+        work as usual. Subclasses override `handle`.
     """
-    async def dispatch(self, request: Request, call_next: Callable):
-        try:
-            response = await call_next(request)
-            return response
+    def __init__(self, app: ASGIApp):
+        self.app = app
 
-        except NoResultFound as e:
-            logger.exception(f'NoResultFound: {e}')
-            response = ServerResponse(status='error', message='Row not found')
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
 
-        except MultipleResultsFound as e:
-            logger.exception(f'MultipleResultsFound: {e}')
-            response = ServerResponse(
-                status='error', message='Multiple rows found')
+        responseStarted = False
 
-        except IntegrityError as e:
-            e.hide_parameters = True
-            logger.exception(f'IntegrityError: {e}')
-            response = ServerResponse(
-                status='error', message=str(e))
+        async def _send(message: Message):
+            nonlocal responseStarted
+            if message['type'] == 'http.response.start':
+                responseStarted = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        except Exception as e:
+            response = self.handle(e)
+            # Once the response started we can't replace it anymore
+            if response is None or responseStarted:
+                raise
+            await ORJSONResponse(response.dict(), status_code=400)(scope, receive, send)
 
-        return ORJSONResponse(response.dict(), status_code=400)
+    def handle(self, exc: Exception) -> ServerResponse | None:
+        """
+            Returns the response for the exception, or None to let it propagate.
+        """
+        return None
 
 
-class CatchAllMiddleware(BaseHTTPMiddleware):
+class DBExceptionsMiddleware(ErrorMappingMiddleware):
     """
-        Middleware to catch errors.
+        Middleware to catch and handle database exceptions.
     """
-    async def dispatch(self, request: Request, call_next: Callable):
-        try:
-            response = await call_next(request)
-            return response
+    def handle(self, exc: Exception) -> ServerResponse | None:
+        if isinstance(exc, NoResultFound):
+            logger.exception(f'NoResultFound: {exc}')
+            return ServerResponse(status='error', message='Row not found')
 
-        except Exception as e:
-            # TODO: SEND NOTIFICATION HERE
-            logger.exception(e)
-            response = ServerResponse(
-                status='error', message=str(e))
-            return ORJSONResponse(response.dict(), status_code=400)
+        if isinstance(exc, MultipleResultsFound):
+            logger.exception(f'MultipleResultsFound: {exc}')
+            return ServerResponse(status='error', message='Multiple rows found')
+
+        if isinstance(exc, IntegrityError):
+            exc.hide_parameters = True
+            logger.exception(f'IntegrityError: {exc}')
+            return ServerResponse(status='error', message=str(exc))
 
+        return None
 
-class ProfilingMiddleware(BaseHTTPMiddleware):
+
+class CatchAllMiddleware(ErrorMappingMiddleware):
     """
         Middleware to catch errors.
     """
-    async def dispatch(self, request: Request, call_next: Callable):
-        if settings.PROFILING:
-            # profiler = Profiler(interval=settings.profiling_interval, async_mode='enabled')
-
-            # profiler.start()
-            # response = await call_next(request)
-            # profiler.stop()
-
-            # return response
-            return await call_next(request)
-        else:
-            return await call_next(request)
+    def handle(self, exc: Exception) -> ServerResponse | None:
+        # TODO: SEND NOTIFICATION HERE
+        logger.exception(exc)
+        return ServerResponse(status='error', message=str(exc))
+
+
+class ProfilingMiddleware:
+    """
+        Middleware to profile requests with pyinstrument when `PROFILING` is enabled.
+        A request is profiled if it sends `PROFILING_TOKEN` in the `PROFILING_TRIGGER`
+        header or query parameter, or if it's picked by sampling 1 in
+        `PROFILING_SAMPLE_RATE` requests. Without a token, clients can't trigger it.
+        Profiles are written by `ProfileStore`.
+    """
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.store = ProfileStore(
+            settings.PROFILING_DIR,
+            maxFiles=settings.PROFILING_MAX_FILES,
+            maxRoutes=settings.PROFILING_MAX_ROUTES,
+            outputFormat=settings.PROFILING_FORMAT,
+        )
+        self._requestCount = 0
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if not settings.PROFILING or scope['type'] != 'http' or not self._shouldProfile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profiler = Profiler(interval=settings.PROFILING_INTERVAL, async_mode='enabled')
+        profiler.start()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session = profiler.stop()
+            # The router stores the matched route in the scope. Unmatched paths share one
+            # profile, so scanned URLs don't add a profile each
+            route = scope.get('route')
+            routeName = f'{scope["method"]} {route.path}' if route is not None else UNMATCHED_ROUTE
+            try:
+                await run_in_threadpool(self.store.save, routeName, session)
+            except Exception as e:
+                logger.error(f'Failed to save the profile of {routeName}: {e}')
+
+    def _shouldProfile(self, scope: Scope) -> bool:
+        if settings.PROFILING_SAMPLE_RATE > 0:
+            self._requestCount += 1
+            if self._requestCount % settings.PROFILING_SAMPLE_RATE == 0:
+                return True
+
+        token = settings.PROFILING_TOKEN
+        if not token:
+            return False
+
+        trigger = settings.PROFILING_TRIGGER
+        value = Headers(scope=scope).get(trigger)
+        if value is None:
+            value = QueryParams(scope['query_string']).get(trigger)
+        if value is None:
+            return False
+        return hmac.compare_digest(value.encode(), token.encode())
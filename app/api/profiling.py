@@ -0,0 +1,154 @@
+import os
+import re
+import time
+import threading
+
+from pyinstrument.session import Session
+from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+from pyinstrument.frame_info import IDENTIFIER_SEP, frame_info_get_identifier
+
+# Route of requests that matched no route
+UNMATCHED_ROUTE = '<unmatched>'
+# `<route>.<pid>.folded`, or its temporary file
+_AGGREGATE_FILE = re.compile(r'.+\.(\d+)\.folded(?:\.tmp)?')
+
+
+def _fileSafe(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', name).strip('_') or 'root'
+
+
+def _frameName(identifier: str) -> str:
+    parts = identifier.split(IDENTIFIER_SEP)
+    if len(parts) != 3:
+        return identifier
+    function, path, line = parts
+    return f'{function} ({os.path.basename(path)}:{line})'
+
+
+def _isRunning(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running, but owned by another user
+        return True
+    return True
+
+
+class ProfileStore:
+    """
+        Writes profiled requests to a bounded ring directory and keeps an aggregated
+        flame profile per route.
+
+        Each session is rendered to `<directory>/<time>-<route>.<ext>`, and only the
+        newest `maxFiles` of them are kept. The samples of every session are also
+        added to a per-route collapsed stack profile, written to
+        `<directory>/aggregate/<route>.<pid>.folded` by each worker. These can be
+        opened in speedscope, or concatenated and turned into a flame graph with
+        `flamegraph.pl`. Only the first `maxRoutes` routes are aggregated, and the
+        aggregates of workers that are gone are removed.
+
+        Params:\n
+            directory - Directory profiles are written to.\n
+            maxFiles - Number of per-request profiles kept on disk.\n
+            maxRoutes - Number of routes with an aggregated profile per worker.\n
+            outputFormat - `html` or `speedscope`.
+    """
+
+    def __init__(self, directory: str, maxFiles: int = 100, maxRoutes: int = 100,
+                 outputFormat: str = 'html'):
+        self.directory = directory
+        self.maxFiles = maxFiles
+        self.maxRoutes = maxRoutes
+        self.outputFormat = outputFormat
+        self._aggregates: dict[str, dict[str, float]] = {}
+        # Pid the aggregates of dead workers were last pruned for
+        self._prunedPid: int | None = None
+        # Sessions are saved from the threadpool
+        self._lock = threading.Lock()
+
+    def save(self, route: str, session: Session):
+        """
+            Saves the session of a request to `route`. Blocking, run it in a thread.
+        """
+        routeName = _fileSafe(route)
+        os.makedirs(os.path.join(self.directory, 'aggregate'), exist_ok=True)
+
+        if self.outputFormat == 'speedscope':
+            output, extension = SpeedscopeRenderer().render(session), 'speedscope.json'
+        else:
+            output, extension = HTMLRenderer().render(session), 'html'
+
+        fileName = f'{time.time_ns()}-{routeName}.{extension}'
+        with open(os.path.join(self.directory, fileName), 'w', encoding='utf-8') as f:
+            f.write(output)
+
+        with self._lock:
+            self._trim()
+            if self._prunedPid != os.getpid():
+                self._pruneAggregates()
+                self._prunedPid = os.getpid()
+
+            stacks = self._aggregates.get(routeName)
+            if stacks is None:
+                if len(self._aggregates) >= self.maxRoutes:
+                    return
+                stacks = self._aggregates[routeName] = {}
+            for stack, duration in self._foldedStacks(session):
+                stacks[stack] = stacks.get(stack, 0.0) + duration
+            self._writeAggregate(routeName, stacks)
+
+    def _trim(self):
+        """
+            Removes the oldest profiles once there are more than `maxFiles`.
+        """
+        files = sorted(
+            entry.name for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name[:1].isdigit()
+        )
+        for name in files[:max(len(files) - self.maxFiles, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                # Another worker removed it first
+                pass
+
+    def _pruneAggregates(self):
+        """
+            Removes the aggregated profiles written by workers that are no longer running.
+        """
+        directory = os.path.join(self.directory, 'aggregate')
+        for entry in os.scandir(directory):
+            match = _AGGREGATE_FILE.fullmatch(entry.name)
+            if match is None or _isRunning(int(match.group(1))):
+                continue
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def _writeAggregate(self, routeName: str, stacks: dict[str, float]):
+        path = os.path.join(self.directory, 'aggregate', f'{routeName}.{os.getpid()}.folded')
+        # Weights are in microseconds
+        lines = [f'{stack} {round(duration * 1_000_000)}' for stack, duration in stacks.items()]
+        tmpPath = f'{path}.tmp'
+        with open(tmpPath, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines))
+        os.replace(tmpPath, path)
+
+    @staticmethod
+    def _foldedStacks(session: Session):
+        """
+            Yields `(stack, seconds)` pairs in collapsed stack format, without the
+            frames that were already on the stack when profiling started.
+        """
+        prefix = [frame_info_get_identifier(frame) for frame in session.start_call_stack]
+        for frames, duration in session.frame_records:
+            identifiers = [frame_info_get_identifier(frame) for frame in frames]
+            start = 0
+            while (start < len(prefix) and start < len(identifiers)
+                   and identifiers[start] == prefix[start]):
+                start += 1
+            stack = ';'.join(_frameName(identifier) for identifier in identifiers[start:])
+            yield stack or 'root', duration
@@ -1,23 +1,35 @@
-from jose import jwt
+import time
+
 from loguru import logger
-from jose.constants import Algorithms
 from fastapi.security import HTTPBearer
-from datetime import datetime, timedelta
 from fastapi import Request, HTTPException
-from jose.exceptions import JWTClaimsError, JWTError, ExpiredSignatureError
 
 from app.core.config import settings
-from app.cache.redis import SessionStore
+from app.cache.near_cache import NearCache
+from app.cache.redis import AsyncSessionStore
 from app.util.common import generateNonce
+from app.auth.token_cache import VerifiedTokenCache
+from app.auth.jwt_backend import TokenError, get_backend
 
 from app.types.server import Cookie
 from app.types.jwt import TokenData, JWTPayload
-from app.types.cache import RedisTokenPrefix, UserKey
+from app.types.cache import RedisTokenPrefix, RedisChannel, UserKey
+
+# Signs and verifies tokens, selected with the JWT_BACKEND setting
+BACKEND = get_backend(settings.JWT_BACKEND)
+
+# Local copy of the nonces in Redis so the auth hot path doesn't need a round-trip
+NONCE_CACHE = NearCache(
+    RedisChannel.NONCE_INVALIDATION,
+    maxsize=settings.JWT_NONCE_CACHE_SIZE,
+    ttl=settings.JWT_NONCE_CACHE_TTL,
+)
 
-ALGORITHM = Algorithms.HS256
+# Tokens that already passed verification, so reused tokens skip the decode
+VERIFIED_TOKENS = VerifiedTokenCache(maxsize=settings.JWT_VERIFIED_CACHE_SIZE)
 
 
-def create_jwt(data: TokenData) -> tuple[str, str]:
+async def create_jwt(data: TokenData) -> tuple[str, str]:
     """
     Create access and refresh JWT tokens.
     If the user ID is provided, the database won't be queried.
@@ -33,33 +45,28 @@ def create_jwt(data: TokenData) -> tuple[str, str]:
 
     # Save the nonce in the cache for refresh token invalidation, only if using nonce
     if nonce:
-        set_nonce_in_cache(data.sub, nonce, settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60)
+        await set_nonce_in_cache(data.sub, nonce, settings.REFRESH_TOKEN_EXPIRE_MINUTES * 60)
 
     return access_token, refresh_token
 
 
 def verify_token(token: str) -> JWTPayload | None:
     """
-    Decode a JWT token.
+    Decode a JWT token. Tokens that were already verified are served from the cache
+    until they expire.
     """
+    cached = VERIFIED_TOKENS.get(token)
+    if cached is not None:
+        return cached
+
     try:
-        payload = JWTPayload(
-            **jwt.decode(
-                token,
-                settings.SECRET_KEY,
-                algorithms=[ALGORITHM],
-                options={
-                    'require_iat': True,
-                    'require_exp': True,
-                    'require_sub': True,
-                },
-            )
-        )
+        payload = JWTPayload(**BACKEND.decode(token, settings.SECRET_KEY))
         if settings.JWT_USE_NONCE and not payload.nonce:
             logger.error('Nonce not found in JWT payload.')
             return None
+        VERIFIED_TOKENS.set(token, payload)
         return payload
-    except (JWTError, ExpiredSignatureError, JWTClaimsError) as e:
+    except TokenError as e:
         logger.error(f'Error while verifying JWT: {e}')
         return None
 
@@ -78,54 +85,62 @@ class RequireJWT(HTTPBearer):
             if not payload:
                 raise HTTPException(status_code=403, detail='Invalid token or expired token.')
 
-            validate_nonce(payload)
+            await validate_nonce(payload)
             return payload
         else:
             raise HTTPException(status_code=403, detail='Invalid authorization code.')
 
 
-def RequireRefreshToken(request: Request) -> JWTPayload:
+async def RequireRefreshToken(request: Request) -> JWTPayload:
     refreshToken = request.cookies.get(Cookie.REFRESH_TOKEN, '')
     payload = verify_token(refreshToken)
     if not payload:
         raise HTTPException(status_code=403, detail='Invalid token or expired token.')
 
-    validate_nonce(payload)
+    await validate_nonce(payload)
     return payload
 
 
 def create_token(data: TokenData, nonce: str | None, expire_minutes: int) -> str:
+    now = int(time.time())
     payload = {
         **data.model_dump(),
-        'exp': datetime.utcnow() + timedelta(minutes=expire_minutes),
-        'iat': datetime.utcnow(),
+        'exp': now + expire_minutes * 60,
+        'iat': now,
     }
     if settings.JWT_USE_NONCE and nonce:
         payload['nonce'] = nonce
-    return jwt.encode(payload, settings.SECRET_KEY, algorithm=ALGORITHM)
+    return BACKEND.encode(payload, settings.SECRET_KEY)
 
 
-def set_nonce_in_cache(user_id: str, nonce: str, expiration_time: int):
+async def set_nonce_in_cache(user_id: str, nonce: str, expiration_time: int):
     """
     Store nonce in cache with a specified expiration time.
     """
     if settings.JWT_USE_NONCE:
-        cache = SessionStore(RedisTokenPrefix.USER, user_id, ttl=expiration_time)
-        cache.set(UserKey.NONCE, nonce)
+        cache = AsyncSessionStore(RedisTokenPrefix.USER, user_id, ttl=expiration_time)
+        await cache.set(UserKey.NONCE, nonce)
+        await NONCE_CACHE.invalidate(user_id)
 
 
-def validate_nonce(payload: JWTPayload):
+async def validate_nonce(payload: JWTPayload):
     if not settings.JWT_USE_NONCE:
         return
-    if not is_nonce_in_cache(payload.sub, payload.nonce):
+    if not await is_nonce_in_cache(payload.sub, payload.nonce):
         raise HTTPException(status_code=403, detail='Invalid authorization code.')
 
 
-def is_nonce_in_cache(user_id: str, nonce: str | None) -> bool:
+async def is_nonce_in_cache(user_id: str, nonce: str | None) -> bool:
     """
     Check if the nonce is in the cache.
     """
     if not nonce:
         return False
-    cache = SessionStore(RedisTokenPrefix.USER, user_id)
-    return cache.get(UserKey.NONCE) == nonce
+
+    cached = NONCE_CACHE.get(user_id)
+    if cached is None:
+        generation = NONCE_CACHE.generation
+        cache = AsyncSessionStore(RedisTokenPrefix.USER, user_id)
+        cached = await cache.get(UserKey.NONCE)
+        NONCE_CACHE.set(user_id, cached, generation)
+    return cached == nonce
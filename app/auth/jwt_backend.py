@@ -0,0 +1,179 @@
+"""
+Interchangeable HS256 JWT backends. Every backend takes and returns plain claim
+dicts and raises `TokenError` for any invalid token, so call sites don't depend
+on a specific JWT library. Third party libraries are imported lazily so only the
+selected backend is loaded.
+"""
+import hmac
+import time
+import base64
+import orjson
+import hashlib
+import binascii
+
+from typing import Any, Literal, Protocol
+
+ALGORITHM = 'HS256'
+REQUIRED_CLAIMS = ('iat', 'exp', 'sub')
+
+BackendName = Literal['jose', 'pyjwt', 'hs256']
+
+
+class TokenError(Exception):
+    """Raised when a token can't be created or fails verification."""
+
+
+class JWTBackend(Protocol):
+    def encode(self, claims: dict[str, Any], key: str) -> str:
+        ...
+
+    def decode(self, token: str, key: str) -> dict[str, Any]:
+        """
+        Verifies the signature, expiration and required claims of the token
+        and returns its claims.
+        """
+        ...
+
+
+class JoseBackend:
+    """
+    Backend using python-jose.
+    """
+
+    def __init__(self):
+        from jose import jwt, JWTError
+        self._jwt = jwt
+        self._error = JWTError
+
+    def encode(self, claims: dict[str, Any], key: str) -> str:
+        try:
+            return self._jwt.encode(claims, key, algorithm=ALGORITHM)
+        except self._error as e:
+            raise TokenError(str(e)) from e
+
+    def decode(self, token: str, key: str) -> dict[str, Any]:
+        try:
+            return self._jwt.decode(
+                token,
+                key,
+                algorithms=[ALGORITHM],
+                options={f'require_{claim}': True for claim in REQUIRED_CLAIMS},
+            )
+        except self._error as e:
+            raise TokenError(str(e)) from e
+
+
+class PyJWTBackend:
+    """
+    Backend using PyJWT.
+    """
+
+    def __init__(self):
+        import jwt
+        self._jwt = jwt
+
+    def encode(self, claims: dict[str, Any], key: str) -> str:
+        try:
+            return self._jwt.encode(claims, key, algorithm=ALGORITHM)
+        except self._jwt.PyJWTError as e:
+            raise TokenError(str(e)) from e
+
+    def decode(self, token: str, key: str) -> dict[str, Any]:
+        try:
+            return self._jwt.decode(
+                token,
+                key,
+                algorithms=[ALGORITHM],
+                options={'require': list(REQUIRED_CLAIMS)},
+            )
+        except self._jwt.PyJWTError as e:
+            raise TokenError(str(e)) from e
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _b64decode(data: bytes) -> bytes:
+    return base64.urlsafe_b64decode(data + b'=' * (-len(data) % 4))
+
+
+class HS256Backend:
+    """
+    Minimal HS256 implementation using `hmac` and `orjson`. Only supports what the
+    app needs: a fixed HS256 header and the exp, nbf and iat claims.
+    """
+    _HEADER = _b64encode(orjson.dumps({'alg': ALGORITHM, 'typ': 'JWT'}))
+
+    def encode(self, claims: dict[str, Any], key: str) -> str:
+        try:
+            payload = _b64encode(orjson.dumps(claims))
+        except TypeError as e:
+            raise TokenError(str(e)) from e
+        signingInput = self._HEADER + b'.' + payload
+        signature = hmac.new(key.encode('utf-8'), signingInput, hashlib.sha256).digest()
+        return (signingInput + b'.' + _b64encode(signature)).decode('ascii')
+
+    def decode(self, token: str, key: str) -> dict[str, Any]:
+        try:
+            raw = token.encode('ascii')
+        except UnicodeEncodeError as e:
+            raise TokenError('Invalid token encoding') from e
+
+        parts = raw.split(b'.')
+        if len(parts) != 3:
+            raise TokenError('Not enough segments')
+        header, payload, signature = parts
+
+        try:
+            if header != self._HEADER:
+                # Other libraries may order or space the header differently
+                headerData = orjson.loads(_b64decode(header))
+                if not isinstance(headerData, dict) or headerData.get('alg') != ALGORITHM:
+                    raise TokenError('The specified alg value is not allowed')
+
+            expected = hmac.new(
+                key.encode('utf-8'), header + b'.' + payload, hashlib.sha256
+            ).digest()
+            if not hmac.compare_digest(expected, _b64decode(signature)):
+                raise TokenError('Signature verification failed')
+
+            claims = orjson.loads(_b64decode(payload))
+        except (binascii.Error, orjson.JSONDecodeError) as e:
+            raise TokenError('Invalid token encoding') from e
+
+        if not isinstance(claims, dict):
+            raise TokenError('Invalid payload')
+        self._validateClaims(claims)
+        return claims
+
+    @staticmethod
+    def _validateClaims(claims: dict[str, Any]):
+        for claim in REQUIRED_CLAIMS:
+            if claim not in claims:
+                raise TokenError(f'Token is missing the "{claim}" claim')
+
+        now = time.time()
+        for claim in ('exp', 'nbf', 'iat'):
+            if claim in claims and not isinstance(claims[claim], (int, float)):
+                raise TokenError(f'{claim} claim must be a number')
+        if claims['exp'] <= now:
+            raise TokenError('Signature has expired')
+        if 'nbf' in claims and claims['nbf'] > now:
+            raise TokenError('The token is not yet valid (nbf)')
+        if not isinstance(claims['sub'], str):
+            raise TokenError('Subject must be a string')
+
+
+BACKENDS: dict[str, type[JWTBackend]] = {
+    'jose': JoseBackend,
+    'pyjwt': PyJWTBackend,
+    'hs256': HS256Backend,
+}
+
+
+def get_backend(name: BackendName) -> JWTBackend:
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f'Unknown JWT backend: {name}')
@@ -0,0 +1,57 @@
+import time
+import hashlib
+
+from collections import OrderedDict
+from app.types.jwt import JWTPayload
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of tokens that already passed verification, keyed by a digest of
+    the token string. Entries expire at the token's own `exp` claim, so a hit is
+    exactly as valid as a full decode would be.
+
+    Params:\n
+        maxsize - Maximum number of tokens kept in memory.
+    """
+
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[JWTPayload, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> JWTPayload | None:
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        payload, expiresAt = entry
+        if time.time() >= expiresAt:
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def set(self, token: str, payload: JWTPayload):
+        self._entries[self._key(token)] = (payload, payload.exp.timestamp())
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        # Storing a digest keeps entries small and raw tokens out of memory
+        return hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
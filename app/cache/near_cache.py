@@ -0,0 +1,111 @@
+import time
+import asyncio
+import redis.asyncio as aioredis
+
+from loguru import logger
+from collections import OrderedDict
+from app.cache.redis import AsyncSessionStore
+
+
+class NearCache:
+    """
+    In-process, size-bounded TTL cache that sits in front of Redis. Writers call
+    `invalidate`, which publishes the key on a Redis channel so every worker drops
+    its local copy.
+
+    Entries are only served while this worker is subscribed to the channel. If the
+    subscription drops, lookups fall through to Redis until it is re-established, so
+    a missed invalidation can never be served for longer than `ttl` seconds.
+
+    Params:\n
+        channel - Redis pub/sub channel used for invalidation messages.\n
+        maxsize - Maximum number of entries kept in memory.\n
+        ttl - Upper bound in seconds on how long an entry is served without
+        checking Redis again.
+    """
+
+    def __init__(self, channel: str, maxsize: int = 10_000, ttl: float = 5):
+        self.channel = channel
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._generation = 0
+        self._listening = False
+        self._retryAt = 0.0
+        self._task: asyncio.Task | None = None
+
+    @property
+    def generation(self) -> int:
+        """
+        Changes every time an entry is invalidated. Read it before loading a value
+        from Redis and pass it to `set`, so a value loaded before an invalidation
+        is not stored after it.
+        """
+        return self._generation
+
+    def get(self, key: str) -> str | None:
+        """
+        Returns the cached value, or None on a miss.
+        """
+        self._ensureListener()
+        if not self._listening:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expiresAt = entry
+        if time.monotonic() >= expiresAt:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: str, generation: int):
+        if not self._listening or generation != self._generation:
+            return
+
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, key: str):
+        """
+        Drops the key locally and tells every other worker to drop it.
+        """
+        self._evict(key)
+        client = aioredis.StrictRedis(connection_pool=AsyncSessionStore.get_pool())
+        await client.publish(self.channel, key)
+
+    def _evict(self, key: str):
+        self._generation += 1
+        self._entries.pop(key, None)
+
+    def _ensureListener(self):
+        if self._task is not None and not self._task.done():
+            return
+        if time.monotonic() < self._retryAt:
+            return
+        self._task = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self):
+        client = aioredis.StrictRedis(connection_pool=AsyncSessionStore.get_pool())
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        try:
+            await pubsub.subscribe(self.channel)
+            self._listening = True
+            async for message in pubsub.listen():
+                if message['type'] == 'message':
+                    self._evict(message['data'].decode('utf-8'))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f'NearCache lost its subscription to {self.channel}: {e}')
+            self._retryAt = time.monotonic() + 1
+        finally:
+            # Anything cached may have missed an invalidation from here on
+            self._listening = False
+            self._generation += 1
+            self._entries.clear()
+            await pubsub.aclose()
@@ -1,5 +1,8 @@
 import redis
+import redis.asyncio as aioredis
 
+from typing import Any, Mapping
+from redis.asyncio.client import Pipeline
 from app.core.config import settings
 
 
@@ -52,3 +55,80 @@ class SessionStore:
 
     def _refresh(self):
         self.redis.expire(self.token, self.ttl)
+
+
+class AsyncSessionStore:
+    """
+    Async counterpart of SessionStore. Every operation is sent together with its
+    TTL refresh in a single MULTI/EXEC pipeline, so each call is one round-trip.
+    """
+    _pool: aioredis.ConnectionPool | None = None
+
+    @classmethod
+    def get_pool(cls) -> aioredis.ConnectionPool:
+        # Created lazily so each worker process gets its own pool
+        if cls._pool is None:
+            cls._pool = aioredis.ConnectionPool(
+                host=settings.REDIS_HOST,
+                port=settings.REDIS_PORT,
+                password=settings.REDIS_PASSWORD,
+                connection_class=aioredis.SSLConnection,
+            )
+        return cls._pool
+
+    def __init__(self, *tokens: str, ttl: int = (60 * 60 * 4)):
+        """
+        Params:\n
+            tokens - Used to create a session in redis. Key/value pairs are unique to this token.
+            Pass in multiple tokens and they will be joined into one.\n
+            ttl - Time to live in seconds. Defaults to 4 hours.
+        """
+        self.token = ':'.join(tokens)
+        self.redis = aioredis.StrictRedis(connection_pool=self.get_pool())
+        self.ttl = ttl
+
+    async def set(self, key: str, value: str) -> int:
+        async with self.redis.pipeline() as pipe:
+            pipe.hset(self.token, key, value)
+            return await self._execute(pipe)
+
+    async def set_many(self, mapping: Mapping[str | bytes, str]) -> int:
+        async with self.redis.pipeline() as pipe:
+            pipe.hset(self.token, mapping=mapping)
+            return await self._execute(pipe)
+
+    async def get(self, key: str) -> str:
+        async with self.redis.pipeline() as pipe:
+            pipe.hget(self.token, key)
+            val = await self._execute(pipe)
+        if not val:
+            return ''
+        return val.decode('utf-8')
+
+    async def get_many(self, *keys: str) -> list[str]:
+        async with self.redis.pipeline() as pipe:
+            pipe.hmget(self.token, keys)
+            vals = await self._execute(pipe)
+        return [val.decode('utf-8') if val else '' for val in vals]
+
+    async def delete(self, key: str) -> int:
+        async with self.redis.pipeline() as pipe:
+            pipe.hdel(self.token, key)
+            return await self._execute(pipe)
+
+    async def deleteSelf(self):
+        await self.redis.delete(self.token)
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        async with self.redis.pipeline() as pipe:
+            pipe.hincrby(self.token, key, amount)
+            return await self._execute(pipe)
+
+    async def _execute(self, pipe: Pipeline) -> Any:
+        """
+        Queues the TTL refresh after the buffered command and runs both in one
+        transaction. Returns the result of the buffered command.
+        """
+        pipe.expire(self.token, self.ttl)
+        result, _ = await pipe.execute()
+        return result
@@ -0,0 +1,92 @@
+import orjson
+import hashlib
+import functools
+import redis.asyncio as aioredis
+
+from typing import Any, Callable
+from loguru import logger
+from pydantic import TypeAdapter
+from redis.exceptions import RedisError
+
+from app.types.cache import RedisTokenPrefix
+from app.cache.redis import AsyncSessionStore
+from app.cache.time_cache import aio_time_cache, aio_method_cache
+
+
+def redis_time_cache(max_age_seconds, maxsize=128, typed=False, returns: Any = None,
+                     key: Callable[..., Any] | None = None, local_max_age_seconds=None,
+                     per_instance=False, **local_options):
+    """Two-tier cache decorator for async functions. Results are cached in-process by
+    `aio_time_cache` and shared with every worker and host through Redis, so a value is
+    computed once per TTL instead of once per worker.
+
+    On a local miss Redis is checked before calling the function, and fresh results are
+    written back to Redis. If Redis is unavailable the function is called directly.
+
+    Args:
+        max_age_seconds: Time to live for results in Redis (in seconds).
+        maxsize: Maximum local cache size.
+        typed: Cache on distinct input types in the local cache.
+        returns: Return type of the function, e.g. `User` or `list[Guild]`. Results are
+            serialized with pydantic so models round-trip through Redis. If not set,
+            results must be serializable by orjson.
+        key: Builds the shared cache key from the call arguments. Must be stable across
+            processes, so pass one for methods or arguments without a stable `repr`.
+        local_max_age_seconds: Time to live in the local cache, defaults to
+            `max_age_seconds`.
+        per_instance: For methods, keep the local cache per instance with
+            `aio_method_cache` instead of keying it on `self`. Requires `key`, since
+            `self` has no stable `repr`.
+        local_options: Passed to the local cache decorator, e.g. `stale_ttl` or
+            `negative_ttl`.
+    """
+    if per_instance and key is None:
+        raise ValueError('redis_time_cache(per_instance=True) requires a key function')
+
+    adapter = TypeAdapter(returns) if returns is not None else None
+
+    def _encode(value: Any) -> bytes:
+        if adapter is not None:
+            return adapter.dump_json(value)
+        return orjson.dumps(value)
+
+    def _decode(raw: bytes) -> Any:
+        if adapter is not None:
+            return adapter.validate_json(raw)
+        return orjson.loads(raw)
+
+    def _decorator(fn):
+        namespace = f'{RedisTokenPrefix.CACHE}:{fn.__module__}.{fn.__qualname__}'
+
+        def _redisKey(args, kwargs) -> str:
+            parts = key(*args, **kwargs) if key else (args, sorted(kwargs.items()))
+            digest = hashlib.blake2b(orjson.dumps(parts, default=repr), digest_size=16)
+            return f'{namespace}:{digest.hexdigest()}'
+
+        localCache = aio_method_cache if per_instance else aio_time_cache
+
+        @localCache(local_max_age_seconds or max_age_seconds, maxsize=maxsize, typed=typed,
+                    **local_options)
+        @functools.wraps(fn)
+        async def _wrapped(*args, **kwargs):
+            client = aioredis.StrictRedis(connection_pool=AsyncSessionStore.get_pool())
+            redisKey = _redisKey(args, kwargs)
+
+            try:
+                raw = await client.get(redisKey)
+                if raw is not None:
+                    return _decode(raw)
+            except (RedisError, ValueError) as e:
+                logger.warning(f'Redis cache read failed for {namespace}: {e}')
+
+            result = await fn(*args, **kwargs)
+
+            try:
+                await client.set(redisKey, _encode(result), px=int(max_age_seconds * 1000))
+            except (RedisError, ValueError) as e:
+                logger.warning(f'Redis cache write failed for {namespace}: {e}')
+            return result
+
+        return _wrapped
+
+    return _decorator
@@ -0,0 +1,103 @@
+import bisect
+
+from typing import Callable, Iterator
+from prometheus_client.registry import REGISTRY, Collector
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+
+# Upper bounds of the load time histogram buckets, in seconds
+LOAD_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class CacheStats:
+    """
+    Statistics of one cache. Counting is plain attribute access so it stays cheap on the
+    hot path, the values are only turned into metrics when they are scraped.
+
+    Params:\n
+        name - Name of the cache, used as the `cache` label.\n
+        maxsize - Maximum size of the cache, None if unbounded.\n
+        size - Returns the current number of entries.
+    """
+
+    def __init__(self, name: str, maxsize: int | None, size: Callable[[], int]):
+        self.name = name
+        self.maxsize = maxsize
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.loadTimeCounts = [0] * (len(LOAD_TIME_BUCKETS) + 1)
+        self.loadTimeSum = 0.0
+
+    def observeLoad(self, seconds: float):
+        """
+        Records how long it took to compute a value on a cache miss.
+        """
+        self.loadTimeCounts[bisect.bisect_left(LOAD_TIME_BUCKETS, seconds)] += 1
+        self.loadTimeSum += seconds
+
+
+# Every cache created by the time_cache decorators, by name
+CACHES: dict[str, CacheStats] = {}
+
+
+def registerCache(name: str, maxsize: int | None, size: Callable[[], int]) -> CacheStats:
+    if name in CACHES:
+        # The same function was decorated more than once
+        name = f'{name}#{len(CACHES)}'
+    stats = CacheStats(name, maxsize, size)
+    CACHES[name] = stats
+    return stats
+
+
+class CacheCollector(Collector):
+    """
+    Exports the statistics of every registered cache to Prometheus.
+    """
+
+    def collect(self) -> Iterator:
+        hits = CounterMetricFamily('cache_hits', 'Cache hits.', labels=['cache'])
+        misses = CounterMetricFamily('cache_misses', 'Cache misses.', labels=['cache'])
+        evictions = CounterMetricFamily(
+            'cache_evictions', 'Entries removed because the cache was full.', labels=['cache']
+        )
+        expirations = CounterMetricFamily(
+            'cache_expirations', 'Entries removed because they expired.', labels=['cache']
+        )
+        size = GaugeMetricFamily('cache_size', 'Current number of entries.', labels=['cache'])
+        maxsize = GaugeMetricFamily('cache_maxsize', 'Maximum number of entries.',
+                                    labels=['cache'])
+        loadTime = HistogramMetricFamily(
+            'cache_load_seconds', 'Time spent computing values on cache misses.',
+            labels=['cache']
+        )
+
+        for stats in list(CACHES.values()):
+            labels = [stats.name]
+            hits.add_metric(labels, stats.hits)
+            misses.add_metric(labels, stats.misses)
+            evictions.add_metric(labels, stats.evictions)
+            expirations.add_metric(labels, stats.expirations)
+            size.add_metric(labels, stats.size())
+            if stats.maxsize is not None:
+                maxsize.add_metric(labels, stats.maxsize)
+
+            buckets = []
+            total = 0
+            for bound, count in zip(LOAD_TIME_BUCKETS + (float('inf'),), stats.loadTimeCounts):
+                total += count
+                buckets.append((str(bound) if bound != float('inf') else '+Inf', total))
+            loadTime.add_metric(labels, buckets, stats.loadTimeSum)
+
+        yield from (hits, misses, evictions, expirations, size, maxsize, loadTime)
+
+
+def registerCacheMetrics():
+    """
+    Exports the statistics of all time_cache and aio_time_cache caches.
+    """
+    REGISTRY.register(CacheCollector())
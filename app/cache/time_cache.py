@@ -1,75 +1,326 @@
 import time
+import random
 import asyncio
+import inspect
+import weakref
+import threading
 import functools
+import contextlib
 
-from collections import OrderedDict
+from typing import Any
+from collections import OrderedDict, namedtuple
+from app.cache.stats import CacheStats, registerCache
 
 
-def time_cache(max_age_seconds, maxsize=128, typed=False):
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+def _cacheName(fn) -> str:
+    return f'{fn.__module__}.{fn.__qualname__}'
+
+
+def _make_key(args, kwargs, typed):
+    key = args, tuple(sorted(kwargs.items()))
+    if typed:
+        key += (tuple(type(arg) for arg in args),
+                tuple(type(value) for value in kwargs.values()))
+    return key
+
+
+def _argumentsKey(fn, exclude, typed):
+    """
+        Returns a function building the key of a method call from its arguments
+        without `self`, leaving out the `exclude` arguments.
+    """
+    if not exclude:
+        return lambda args, kwargs: _make_key(args, kwargs, typed)
+
+    signature = inspect.signature(fn)
+
+    def _key(args, kwargs):
+        # Bind to the signature so positional and keyword arguments give the same key
+        bound = signature.bind(None, *args, **kwargs)
+        items = tuple(
+            (name, value) for name, value in list(bound.arguments.items())[1:]
+            if name not in exclude
+        )
+        if typed:
+            items += tuple(type(value) for _, value in items)
+        return items
+
+    return _key
+
+
+def time_cache(max_age_seconds, maxsize=128, typed=False, thread_safe=False,
+               sweep_interval=None):
     """
         Least-recently-used cache decorator with time-based cache invalidation.
+        Every entry expires `max_age_seconds` after it was stored. Expired entries are
+        dropped when they are looked up, and all of them are swept every
+        `sweep_interval` seconds.
+
+        Like `functools.lru_cache`, the wrapped function gets `cache_info()`,
+        `cache_clear()` and `cache_parameters()`. Statistics are also registered in
+        `app.cache.stats` for Prometheus.
 
         Args:
             max_age_seconds: Time to live for cached results (in seconds).
-            maxsize: Maximum cache size (see `functools.lru_cache`).
+            maxsize: Maximum cache size, None for no limit (see `functools.lru_cache`).
             typed: Cache on distinct input types (see `functools.lru_cache`).
+            thread_safe: Guard the cache with a lock, for functions called from several
+                threads, e.g. sync endpoints run in the threadpool. The lock is not held
+                while the function runs.
+            sweep_interval: Seconds between sweeps of expired entries. Defaults to
+                `max_age_seconds`.
     """
+    if sweep_interval is None:
+        sweep_interval = max_age_seconds
+
     def _decorator(fn):
-        @functools.lru_cache(maxsize=maxsize, typed=typed)
-        def _new(*args, __time_salt, **kwargs):
-            return fn(*args, **kwargs)
+        # Entries are (result, expires at)
+        cache = OrderedDict()
+        lock = threading.Lock() if thread_safe else contextlib.nullcontext()
+        stats = registerCache(_cacheName(fn), maxsize, cache.__len__)
+        nextSweep = time.monotonic() + sweep_interval
+
+        def _sweep(now):
+            expired = [key for key, (_, expiresAt) in cache.items() if now >= expiresAt]
+            for key in expired:
+                del cache[key]
+            stats.expirations += len(expired)
 
         @functools.wraps(fn)
         def _wrapped(*args, **kwargs):
-            return _new(*args, **kwargs, __time_salt=int(time.time() / max_age_seconds))
+            nonlocal nextSweep
+            key = _make_key(args, kwargs, typed)
+            now = time.monotonic()
+
+            with lock:
+                if now >= nextSweep:
+                    _sweep(now)
+                    nextSweep = now + sweep_interval
 
+                entry = cache.get(key)
+                if entry is not None:
+                    result, expiresAt = entry
+                    if now < expiresAt:
+                        stats.hits += 1
+                        cache.move_to_end(key)
+                        return result
+                    del cache[key]
+                    stats.expirations += 1
+                stats.misses += 1
+
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            loadTime = time.perf_counter() - start
+
+            with lock:
+                stats.observeLoad(loadTime)
+                cache[key] = (result, time.monotonic() + max_age_seconds)
+                cache.move_to_end(key)
+                # Remove oldest items if cache is full
+                while maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+                    stats.evictions += 1
+            return result
+
+        def cache_info() -> CacheInfo:
+            with lock:
+                return CacheInfo(stats.hits, stats.misses, maxsize, len(cache))
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                stats.reset()
+
+        def cache_parameters() -> dict[str, Any]:
+            return {'maxsize': maxsize, 'typed': typed, 'max_age_seconds': max_age_seconds}
+
+        _wrapped.cache_info = cache_info  # type: ignore[attr-defined]
+        _wrapped.cache_clear = cache_clear  # type: ignore[attr-defined]
+        _wrapped.cache_parameters = cache_parameters  # type: ignore[attr-defined]
         return _wrapped
 
     return _decorator
 
 
-def aio_time_cache(max_age_seconds, maxsize=128, typed=False):
+class _AsyncTimeCache:
+    """
+        Cache state behind `aio_time_cache` and `aio_method_cache`. Entries are
+        (result, error, expires at, stale until). All bookkeeping happens without
+        awaiting, so it can't interleave with other coroutines and needs no lock.
+    """
+
+    def __init__(self, stats: CacheStats, max_age_seconds, maxsize, stale_ttl, negative_ttl,
+                 negative_exceptions, jitter):
+        self.stats = stats
+        self.max_age_seconds = max_age_seconds
+        self.maxsize = maxsize
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self.negative_exceptions = negative_exceptions
+        self.jitter = jitter
+        self.entries: OrderedDict = OrderedDict()
+        # Calls currently running, by key
+        self.inflight: dict[Any, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+
+    async def get(self, key, fn, args, kwargs):
+        stats = self.stats
+        now = time.monotonic()
+
+        entry = self.entries.get(key)
+        if entry is not None:
+            result, error, expiresAt, staleUntil = entry
+            if now < staleUntil:
+                stats.hits += 1
+                # Move to end to show that it was recently used
+                self.entries.move_to_end(key)
+                if now >= expiresAt:
+                    # Serve the stale value and refresh it in the background
+                    self._call(key, fn, args, kwargs)
+                if error is not None:
+                    raise error.with_traceback(None)
+                return result
+            del self.entries[key]
+            stats.expirations += 1
+
+        # Cache miss or value has expired
+        stats.misses += 1
+        return await asyncio.shield(self._call(key, fn, args, kwargs))
+
+    def _ttl(self, seconds):
+        if self.jitter:
+            return seconds * (1 - random.uniform(0, self.jitter))
+        return seconds
+
+    def _call(self, key, fn, args, kwargs) -> asyncio.Task:
+        # Join the call in flight or start one
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self.inflight[key] = task
+            task.add_done_callback(functools.partial(self._store, key, time.perf_counter()))
+        return task
+
+    def _store(self, key, startedAt, task: asyncio.Task):
+        self.inflight.pop(key, None)
+        if task.cancelled():
+            return
+
+        now = time.monotonic()
+        self.stats.observeLoad(time.perf_counter() - startedAt)
+        error = task.exception()
+        if error is None:
+            expiresAt = now + self._ttl(self.max_age_seconds)
+            self.entries[key] = (task.result(), None, expiresAt, expiresAt + self.stale_ttl)
+        elif self.negative_ttl and isinstance(error, self.negative_exceptions):
+            expiresAt = now + self._ttl(self.negative_ttl)
+            self.entries[key] = (None, error, expiresAt, expiresAt)
+        else:
+            return
+
+        self.entries.move_to_end(key)
+        # Remove oldest items if cache is full
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.stats.evictions += 1
+
+
+def aio_time_cache(max_age_seconds, maxsize=128, typed=False, stale_ttl=0, negative_ttl=0,
+                   negative_exceptions=(Exception,), jitter=0.0):
     """Least-recently-used cache decorator with time-based cache invalidation for async functions.
 
+    Concurrent calls with the same arguments share a single call to the wrapped function
+    (single-flight), while calls with different arguments run in parallel. The wrapped call
+    runs in its own task, so a cancelled caller doesn't cancel it for the others.
+
     Args:
         max_age_seconds: Time to live for cached results (in seconds).
         maxsize: Maximum cache size.
         typed: Cache on distinct input types.
-    """
-    cache = OrderedDict()
-    lock = asyncio.Lock()
-
-    def _key(args, kwargs):
-        return args, tuple(sorted(kwargs.items()))
+        stale_ttl: For this many seconds after a result expired, it is still returned right
+            away while it is refreshed in the background.
+        negative_ttl: Cache exceptions listed in `negative_exceptions` for this many seconds,
+            so callers get the error without hitting upstream again. 0 disables it.
+        negative_exceptions: Exception types cached when `negative_ttl` is set.
+        jitter: Shortens the lifetime of each entry by a random fraction up to this value
+            (e.g. 0.1 for up to 10%), so entries created together don't expire together.
 
+    The wrapped function gets `cache_info()` and `cache_clear()`, and its statistics are
+    registered in `app.cache.stats` for Prometheus.
+    """
     def _decorator(fn):
+        stats = registerCache(_cacheName(fn), maxsize, lambda: len(cache))
+        cache = _AsyncTimeCache(stats, max_age_seconds, maxsize, stale_ttl, negative_ttl,
+                                negative_exceptions, jitter)
+
         @functools.wraps(fn)
         async def _wrapped(*args, **kwargs):
-            async with lock:
-                key = _key(args, kwargs)
-                if typed:
-                    key += (tuple(type(arg) for arg in args),
-                            tuple(type(value) for value in kwargs.values()))
-                now = time.time()
-
-                # Cache hit and check if value is still fresh
-                if key in cache:
-                    result, timestamp = cache.pop(key)
-                    if now - timestamp <= max_age_seconds:
-                        # Move to end to show that it was recently used
-                        cache[key] = (result, timestamp)
-                        return result
+            return await cache.get(_make_key(args, kwargs, typed), fn, args, kwargs)
 
-                # Cache miss or value has expired
-                result = await fn(*args, **kwargs)
-                cache[key] = (result, now)
+        def cache_info() -> CacheInfo:
+            return CacheInfo(stats.hits, stats.misses, maxsize, len(cache))
 
-                # Remove oldest items if cache is full
-                while len(cache) > maxsize:
-                    cache.popitem(last=False)
+        def cache_clear():
+            cache.clear()
+            stats.reset()
 
-                return result
+        _wrapped.cache_info = cache_info  # type: ignore[attr-defined]
+        _wrapped.cache_clear = cache_clear  # type: ignore[attr-defined]
+        return _wrapped
+
+    return _decorator
+
+
+def aio_method_cache(max_age_seconds, maxsize=128, typed=False, exclude=(), stale_ttl=0,
+                     negative_ttl=0, negative_exceptions=(Exception,), jitter=0.0):
+    """Variant of `aio_time_cache` for async methods. Every instance gets its own cache, held
+    in a `weakref.WeakKeyDictionary`, so `self` is not part of the keys and the cache is
+    garbage collected together with its instance.
+
+    Args:
+        max_age_seconds: Time to live for cached results (in seconds).
+        maxsize: Maximum cache size of each instance.
+        typed: Cache on distinct input types.
+        exclude: Names of arguments left out of the key, e.g. `('method',)`. Calls that
+            only differ in these arguments share their result.
+        stale_ttl, negative_ttl, negative_exceptions, jitter: See `aio_time_cache`.
+
+    The wrapped method gets `cache_info()` and `cache_clear()`, which cover every instance.
+    """
+    def _decorator(fn):
+        caches: weakref.WeakKeyDictionary[Any, _AsyncTimeCache] = weakref.WeakKeyDictionary()
+        stats = registerCache(_cacheName(fn), maxsize,
+                              lambda: sum(len(cache) for cache in list(caches.values())))
+        makeKey = _argumentsKey(fn, exclude, typed)
+
+        @functools.wraps(fn)
+        async def _wrapped(self, *args, **kwargs):
+            cache = caches.get(self)
+            if cache is None:
+                cache = caches[self] = _AsyncTimeCache(
+                    stats, max_age_seconds, maxsize, stale_ttl, negative_ttl,
+                    negative_exceptions, jitter,
+                )
+            return await cache.get(makeKey(args, kwargs), fn, (self, *args), kwargs)
+
+        def cache_info() -> CacheInfo:
+            return CacheInfo(stats.hits, stats.misses, maxsize, stats.size())
+
+        def cache_clear():
+            for cache in list(caches.values()):
+                cache.clear()
+            stats.reset()
 
+        _wrapped.cache_info = cache_info  # type: ignore[attr-defined]
+        _wrapped.cache_clear = cache_clear  # type: ignore[attr-defined]
         return _wrapped
 
     return _decorator
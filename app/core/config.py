@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Literal
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl, validator
 
@@ -12,10 +12,27 @@ class EnvConfigSettings(BaseSettings):
     SECRET_KEY: str
     REFRESH_KEY: str
     PROFILING: bool = False
+    PROFILING_INTERVAL: float = 0.001
+    # Profile 1 in N requests, 0 only profiles requests that ask for it
+    PROFILING_SAMPLE_RATE: int = 0
+    # Requests with this header or query parameter set to PROFILING_TOKEN are profiled.
+    # Without a token only sampled requests are profiled
+    PROFILING_TRIGGER: str = 'profile'
+    PROFILING_TOKEN: str | None = None
+    PROFILING_DIR: str = 'logs/profiles'
+    PROFILING_MAX_FILES: int = 100
+    # Routes with an aggregated profile, per worker
+    PROFILING_MAX_ROUTES: int = 100
+    PROFILING_FORMAT: Literal['html', 'speedscope'] = 'html'
     JWT_USE_NONCE: bool
+    JWT_BACKEND: Literal['jose', 'pyjwt', 'hs256'] = 'jose'
+    JWT_NONCE_CACHE_SIZE: int = 10_000
+    JWT_NONCE_CACHE_TTL: int = 5  # Max seconds a revoked nonce can be accepted if pub/sub fails
+    JWT_VERIFIED_CACHE_SIZE: int = 10_000
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30  # 30 minutes
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 3  # 3 days
     BACKEND_CORS_ORIGINS: list[AnyHttpUrl] = []
+    LOG_QUEUE_MAXSIZE: int = 10_000  # Log messages waiting to be written, per log file
 
     @validator('BACKEND_CORS_ORIGINS', pre=True)
     def assemble_cors_origins(cls, v: str | list[str]) -> list[str] | str:
@@ -31,7 +48,17 @@ class EnvConfigSettings(BaseSettings):
     MYSQL_PASSWORD: str
     MYSQL_DATABASE: str
     MYSQL_DATABASE_URI: str | None = None
+    MYSQL_ASYNC_DATABASE_URI: str | None = None
     MYSQL_SSL: str
+    MYSQL_POOL_SIZE: int = 5
+    MYSQL_MAX_OVERFLOW: int = 10
+    MYSQL_POOL_RECYCLE: int = 60 * 60  # 1 hour, -1 to disable
+    MYSQL_POOL_TIMEOUT: int = 30
+    # Only ping connections that sat idle in the pool for longer than this.
+    # 0 pings on every checkout, -1 disables pinging
+    MYSQL_POOL_PRE_PING_IDLE_SECONDS: int = 30
+    # Create missing tables on startup. Disable when migrations are run separately
+    MYSQL_SCHEMA_CHECK: bool = True
 
     @validator('MYSQL_DATABASE_URI', pre=True)
     def assemble_mysql_connection(cls, v: str | None, values: dict[str, Any]) -> Any:
@@ -40,6 +67,24 @@ class EnvConfigSettings(BaseSettings):
         return (f"mysql+pymysql://{values.get('MYSQL_USER')}:{values.get('MYSQL_PASSWORD')}"
                 f"@{values.get('MYSQL_HOST')}/{values.get('MYSQL_DATABASE')}")
 
+    @validator('MYSQL_ASYNC_DATABASE_URI', pre=True)
+    def assemble_mysql_async_connection(cls, v: str | None, values: dict[str, Any]) -> Any:
+        if isinstance(v, str):
+            return v
+        return (f"mysql+aiomysql://{values.get('MYSQL_USER')}:{values.get('MYSQL_PASSWORD')}"
+                f"@{values.get('MYSQL_HOST')}/{values.get('MYSQL_DATABASE')}")
+
+    # Discord HTTP client
+    DISCORD_HTTP_LIMIT: int = 100  # Open connections in total, 0 for no limit
+    DISCORD_HTTP_LIMIT_PER_HOST: int = 50
+    DISCORD_HTTP_DNS_CACHE_TTL: int = 300  # seconds
+    DISCORD_HTTP_KEEPALIVE_TIMEOUT: float = 30  # seconds an idle connection is kept open
+    DISCORD_HTTP_TIMEOUT: float = 10  # seconds for the whole request
+    DISCORD_HTTP_CONNECT_TIMEOUT: float = 3  # seconds to get a connection, including the pool
+    DISCORD_HTTP_READ_TIMEOUT: float = 5  # seconds between two reads of the response
+    DISCORD_HTTP_MAX_RESPONSE_SIZE: int = 2 * 1024 * 1024  # bytes
+    DISCORD_HTTP_MAX_HEADER_SIZE: int = 8190  # bytes per header line
+
     # Redis
     REDIS_HOST: str
     REDIS_PORT: int
@@ -1,27 +1,99 @@
+import ssl
+
+from typing import Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from app.core.config import settings
 from sqlalchemy.engine import Engine
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session, DeclarativeBase
+from app.db.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool, setupIdlePrePing
+from sqlalchemy.orm import sessionmaker, scoped_session, Session, DeclarativeBase
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, \
+    async_scoped_session, create_async_engine
 
 if not settings.MYSQL_DATABASE_URI:
     raise ValueError('Missing database URI')
 
+if not settings.MYSQL_ASYNC_DATABASE_URI:
+    raise ValueError('Missing async database URI')
+
 mysqlEngine: Engine = create_engine(
     settings.MYSQL_DATABASE_URI,
     echo=settings.DEBUG,
-    pool_pre_ping=True,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.MYSQL_POOL_SIZE,
+    max_overflow=settings.MYSQL_MAX_OVERFLOW,
+    pool_recycle=settings.MYSQL_POOL_RECYCLE,
+    pool_timeout=settings.MYSQL_POOL_TIMEOUT,
     connect_args={
         'ssl_ca': settings.MYSQL_SSL,
     },
 )
 
+# The async drivers expect an SSL context instead of a CA file path
+mysqlAsyncEngine: AsyncEngine = create_async_engine(
+    settings.MYSQL_ASYNC_DATABASE_URI,
+    echo=settings.DEBUG,
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_size=settings.MYSQL_POOL_SIZE,
+    max_overflow=settings.MYSQL_MAX_OVERFLOW,
+    pool_recycle=settings.MYSQL_POOL_RECYCLE,
+    pool_timeout=settings.MYSQL_POOL_TIMEOUT,
+    connect_args={
+        'ssl': ssl.create_default_context(cafile=settings.MYSQL_SSL),
+    },
+)
+
+setupIdlePrePing(mysqlEngine, settings.MYSQL_POOL_PRE_PING_IDLE_SECONDS)
+setupIdlePrePing(mysqlAsyncEngine.sync_engine, settings.MYSQL_POOL_PRE_PING_IDLE_SECONDS)
+
+# Session factories are built once, sessions are created per request
+mysqlSessionFactory = sessionmaker(bind=mysqlEngine, expire_on_commit=False)
+mysqlAsyncSessionFactory = async_sessionmaker(bind=mysqlAsyncEngine, expire_on_commit=False)
+
+# Identifies the request (or task) that owns the current scoped session
+_sessionScope: ContextVar[Hashable | None] = ContextVar('sessionScope', default=None)
+
+
+def _currentSessionScope() -> Hashable:
+    scope = _sessionScope.get()
+    if scope is None:
+        raise RuntimeError('No database session scope is active, use sessionScope()')
+    return scope
+
+
+# Each active scope gets its own session, so concurrent requests never share
+# an identity map or a transaction
+ScopedMySqlSession = scoped_session(mysqlSessionFactory, scopefunc=_currentSessionScope)
+ScopedMySqlAsyncSession = async_scoped_session(
+    mysqlAsyncSessionFactory, scopefunc=_currentSessionScope
+)
+
+
+@contextmanager
+def sessionScope() -> Iterator[None]:
+    """
+        Starts a new session scope for the current context. Scoped sessions
+        created inside of it are not visible to any other request or task.
+    """
+    token = _sessionScope.set(object())
+    try:
+        yield
+    finally:
+        _sessionScope.reset(token)
+
 
 class MySQLTableBase(DeclarativeBase):
     pass
 
 
 def MySqlSession(expireOnCommit: bool = False) -> Session:
-    return sessionmaker(bind=mysqlEngine, expire_on_commit=expireOnCommit)()
+    return mysqlSessionFactory(expire_on_commit=expireOnCommit)
+
+
+def MySqlAsyncSession(expireOnCommit: bool = False) -> AsyncSession:
+    return mysqlAsyncSessionFactory(expire_on_commit=expireOnCommit)
 
 
 def createMySQLTables():
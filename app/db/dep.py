@@ -1,24 +1,40 @@
-from typing import Iterator
+from typing import AsyncIterator
 from sqlalchemy.orm import Session
-from app.db.connection import MySqlSession
-from app.cache.time_cache import time_cache
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.db.connection import ScopedMySqlSession, ScopedMySqlAsyncSession, sessionScope
 
 
-def get_db() -> Iterator[Session]:
+async def get_db() -> AsyncIterator[Session]:
     """
-        Dependency that gets a cached database session.
+        Dependency that gets a database session scoped to the current request.
+        Calling `ScopedMySqlSession()` anywhere within the request returns the
+        same session. Blocking session calls are run in the threadpool.
     """
-    session = _get_session()
-    try:
-        yield session
-        session.commit()
-    except Exception as exc:
-        session.rollback()
-        raise exc
-    finally:
-        session.close()
+    with sessionScope():
+        session = ScopedMySqlSession()
+        try:
+            yield session
+            await run_in_threadpool(session.commit)
+        except Exception as exc:
+            await run_in_threadpool(session.rollback)
+            raise exc
+        finally:
+            await run_in_threadpool(ScopedMySqlSession.remove)
 
 
-@time_cache(max_age_seconds=60 * 10)
-def _get_session():
-    return MySqlSession()
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """
+        Dependency that gets an async database session scoped to the current
+        request. Queries are awaited so they don't block the event loop.
+    """
+    with sessionScope():
+        session = ScopedMySqlAsyncSession()
+        try:
+            yield session
+            await session.commit()
+        except Exception as exc:
+            await session.rollback()
+            raise exc
+        finally:
+            await ScopedMySqlAsyncSession.remove()
@@ -0,0 +1,102 @@
+import time
+
+from typing import Any, Callable
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DisconnectionError
+from prometheus_client import Gauge, Histogram
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool, ConnectionPoolEntry
+
+POOL_CHECKED_OUT = Gauge(
+    'mysql_pool_checked_out',
+    'Connections currently checked out of the pool.',
+    ['engine'],
+)
+POOL_OVERFLOW = Gauge(
+    'mysql_pool_overflow',
+    'Connections currently open beyond the pool size.',
+    ['engine'],
+)
+POOL_WAIT_SECONDS = Histogram(
+    'mysql_pool_wait_seconds',
+    'Time spent waiting to get a connection from the pool.',
+    ['engine'],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Key in the connection record info dict holding the last checkin time
+_LAST_CHECKIN = 'lastCheckin'
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+        QueuePool that records how long each checkout waited for a connection.
+    """
+    label = 'sync'
+
+    def _do_get(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT_SECONDS.labels(engine=self.label).observe(time.perf_counter() - start)
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """
+        Instrumented pool for async engines.
+    """
+    label = 'async'
+
+
+def setupIdlePrePing(engine: Engine, idleSeconds: int):
+    """
+        Pings connections on checkout only if they have been idle in the pool for
+        longer than `idleSeconds`. This replaces `pool_pre_ping`, which adds a
+        round-trip to every checkout. Pass the `sync_engine` of async engines.
+    """
+    if idleSeconds < 0:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _connect(dbapi_connection: Any, record: ConnectionPoolEntry):
+        record.info[_LAST_CHECKIN] = time.monotonic()
+
+    @event.listens_for(engine, 'checkin')
+    def _checkin(dbapi_connection: Any, record: ConnectionPoolEntry):
+        record.info[_LAST_CHECKIN] = time.monotonic()
+
+    @event.listens_for(engine, 'checkout')
+    def _checkout(dbapi_connection: Any, record: ConnectionPoolEntry, proxy: Any):
+        lastCheckin = record.info.get(_LAST_CHECKIN)
+        if lastCheckin is not None and time.monotonic() - lastCheckin <= idleSeconds:
+            return
+
+        try:
+            alive = engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            # The pool will discard this connection and retry with a new one
+            raise DisconnectionError() from e
+        if not alive:
+            raise DisconnectionError()
+
+
+def registerPoolMetrics(*engines: Engine):
+    """
+        Exports the pool gauges of the given engines to Prometheus. The values
+        are read from the pool when metrics are scraped.
+    """
+    for engine in engines:
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        label = getattr(pool, 'label', engine.name)
+        POOL_CHECKED_OUT.labels(engine=label).set_function(pool.checkedout)
+        POOL_OVERFLOW.labels(engine=label).set_function(_overflowOf(pool))
+
+
+def _overflowOf(pool: QueuePool) -> Callable[[], float]:
+    # overflow() starts at -pool_size while the pool is filling up
+    def overflow() -> float:
+        return max(pool.overflow(), 0)
+    return overflow
@@ -0,0 +1,66 @@
+import os
+import time
+
+from loguru import logger
+from sqlalchemy import text
+from alembic.script import ScriptDirectory
+from alembic.runtime.migration import MigrationContext
+
+import app.models.mysql  # noqa: F401 Registers the tables on the metadata
+from app.core.config import settings
+from app.db.connection import MySQLTableBase, mysqlEngine
+
+# Set once the schema was checked, so processes forked afterwards skip the check
+SCHEMA_CHECKED_ENV = 'MYSQL_SCHEMA_CHECKED'
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'migrations')
+LOCK_NAME = 'fastapi-schema-check'
+
+
+def _alembicHead() -> str | None:
+    try:
+        return ScriptDirectory(MIGRATIONS_DIR).get_current_head()
+    except Exception as e:
+        logger.warning(f'Could not read the Alembic head: {e}')
+        return None
+
+
+def checkSchema() -> float | None:
+    """
+        Creates the missing tables, at most once at a time across every worker and
+        host. A MySQL advisory lock makes sure only one process runs the check, the
+        others skip it instead of waiting. If the database is already at the
+        Alembic head the tables are not reflected at all.
+
+        Returns how long the check took in seconds, or None if it was skipped.
+    """
+    if not settings.MYSQL_SCHEMA_CHECK or os.environ.get(SCHEMA_CHECKED_ENV):
+        return None
+
+    start = time.perf_counter()
+    try:
+        with mysqlEngine.connect() as connection:
+            if not connection.scalar(text('SELECT GET_LOCK(:name, 0)'), {'name': LOCK_NAME}):
+                logger.info('Schema check is already running in another process, skipping')
+                return None
+
+            try:
+                head = _alembicHead()
+                current = MigrationContext.configure(connection).get_current_revision()
+                if head is not None and current == head:
+                    logger.info(f'Database is at the Alembic head {head}, skipping table creation')
+                else:
+                    if head is not None:
+                        logger.warning(f'Database is at revision {current} but the Alembic head '
+                                       f'is {head}, run `alembic upgrade head`')
+                    MySQLTableBase.metadata.create_all(connection)
+                    connection.commit()
+            finally:
+                connection.execute(text('SELECT RELEASE_LOCK(:name)'), {'name': LOCK_NAME})
+    except Exception as e:
+        logger.error(f'Schema check failed: {e}')
+        return None
+
+    elapsed = time.perf_counter() - start
+    logger.info(f'Schema check took {elapsed * 1000:.0f} ms')
+    return elapsed
@@ -1,16 +1,21 @@
+import orjson
+import asyncio
 import aiohttp
 
-from typing import Optional
+from typing import Any, Awaitable, Callable, Optional
 from fastapi import Depends, Request
-from app.cache.time_cache import aio_time_cache
+from pydantic import TypeAdapter
+from app.core.config import settings
+from app.cache.redis_cache import redis_time_cache
 from typing_extensions import TypedDict, Literal
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.discord.models.user import User
 from app.discord.models.guild import Guild, GuildPreview
+from app.discord.ratelimit import RateLimiter
 from app.discord.config import DISCORD_API_URL, DISCORD_OAUTH_AUTHENTICATION_URL, DISCORD_TOKEN_URL
 from app.discord.exceptions import RateLimited, ScopeMissing, Unauthorized, InvalidToken, \
-    ClientSessionNotInitialized
+    ClientSessionNotInitialized, ResponseTooLarge
 
 
 class RefreshTokenPayload(TypedDict):
@@ -38,6 +43,100 @@ class TokenResponse(TypedDict):
 
 PAYLOAD = TokenGrantPayload | RefreshTokenPayload
 
+_GUILDS = TypeAdapter(list[Guild])
+_GUILD_PREVIEWS = TypeAdapter(list[GuildPreview])
+
+# Session shared by every client, opened and closed by the app lifespan
+_shared_session: Optional[aiohttp.ClientSession] = None
+
+
+def create_client_session() -> aiohttp.ClientSession:
+    """
+        Creates an aiohttp session tuned for the Discord API, from the `DISCORD_HTTP_*`
+        settings. Connections to discord.com are kept alive and reused, DNS lookups
+        are cached, and timeouts make sure a slow upstream can't hold a socket forever.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=settings.DISCORD_HTTP_LIMIT,
+        limit_per_host=settings.DISCORD_HTTP_LIMIT_PER_HOST,
+        ttl_dns_cache=settings.DISCORD_HTTP_DNS_CACHE_TTL,
+        keepalive_timeout=settings.DISCORD_HTTP_KEEPALIVE_TIMEOUT,
+    )
+    timeout = aiohttp.ClientTimeout(
+        total=settings.DISCORD_HTTP_TIMEOUT,
+        connect=settings.DISCORD_HTTP_CONNECT_TIMEOUT,
+        sock_read=settings.DISCORD_HTTP_READ_TIMEOUT,
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=timeout,
+        max_line_size=settings.DISCORD_HTTP_MAX_HEADER_SIZE,
+        max_field_size=settings.DISCORD_HTTP_MAX_HEADER_SIZE,
+    )
+
+
+async def open_client_session() -> aiohttp.ClientSession:
+    """
+        Opens the session shared by every `DiscordOAuthClient`.
+    """
+    global _shared_session
+    if _shared_session is None or _shared_session.closed:
+        _shared_session = create_client_session()
+    return _shared_session
+
+
+async def close_client_session():
+    """
+        Closes the shared session and its connections.
+    """
+    global _shared_session
+    if _shared_session is not None:
+        await _shared_session.close()
+        _shared_session = None
+
+
+async def _read_json(resp: aiohttp.ClientResponse) -> Any:
+    """
+        Reads a JSON response body of at most `DISCORD_HTTP_MAX_RESPONSE_SIZE` bytes.
+
+        Raises
+        ------
+        ResponseTooLarge
+            If the body is larger
+    """
+    max_size = settings.DISCORD_HTTP_MAX_RESPONSE_SIZE
+    if resp.content_length is not None and resp.content_length > max_size:
+        raise ResponseTooLarge(resp.content_length)
+    body = bytearray()
+    async for chunk in resp.content.iter_chunked(64 * 1024):
+        body += chunk
+        if len(body) > max_size:
+            raise ResponseTooLarge(len(body))
+    return orjson.loads(body)
+
+
+def _request_cache_key(client: 'DiscordOAuthClient', route: str, token: Optional[str] = None,
+                       method: str = 'GET') -> tuple:
+    """
+        Shared cache key of `DiscordOAuthClient.request`, without the client instance
+        so every worker uses the same key.
+    """
+    return client.client_id, route, token, method
+
+
+def _retry_after(data: Any, headers: Any) -> Optional[float]:
+    """
+        Seconds to wait before retrying a 429, from the body or else the
+        `Retry-After` header. None if neither has a usable value.
+    """
+    value = data.get('retry_after') if isinstance(data, dict) else None
+    if value is None:
+        value = headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
 
 def _tokens(resp: TokenResponse) -> tuple[str, str]:
     """
@@ -83,6 +182,8 @@ class DiscordOAuthClient:
             Optional proxy url
         proxy_auth:
             Optional aiohttp.BasicAuth proxy authentification
+        max_retries:
+            How often a rate limited request is retried after `retry_after`
     """
     client_id: str
     client_secret: str
@@ -100,6 +201,7 @@ class DiscordOAuthClient:
         scopes=("identify",),
         proxy=None,
         proxy_auth: Optional[aiohttp.BasicAuth] = None,
+        max_retries: int = 3,
     ):
         self.client_id = client_id
         self.client_secret = client_secret
@@ -107,14 +209,29 @@ class DiscordOAuthClient:
         self.scopes = '%20'.join(scope for scope in scopes)
         self.proxy = proxy
         self.proxy_auth = proxy_auth
+        self.max_retries = max_retries
+        self.rate_limiter = RateLimiter()
+        self._owns_session = False
+        # Lookups currently running, by (route, token, parse)
+        self._inflight: dict[tuple[str, str, Callable], asyncio.Task] = {}
 
     async def init(self):
         """
-        Initialized the connection to the discord api
+        Initialized the connection to the discord api. Uses the shared session if the
+        app opened one, otherwise creates a session owned by this client.
         """
-        if self.client_session is not None:
+        if self.client_session is not None and not self.client_session.closed:
             return
-        self.client_session = aiohttp.ClientSession()
+        self._owns_session = _shared_session is None or _shared_session.closed
+        self.client_session = create_client_session() if self._owns_session else _shared_session
+
+    async def close(self):
+        """
+        Closes the session, unless it's the shared one
+        """
+        if self.client_session is not None and self._owns_session:
+            await self.client_session.close()
+        self.client_session = None
 
     def get_oauth_login_url(self, state: Optional[str] = None):
         """
@@ -132,49 +249,79 @@ class DiscordOAuthClient:
 
     oauth_login_url = property(get_oauth_login_url)
 
-    @aio_time_cache(max_age_seconds=550)
+    @redis_time_cache(max_age_seconds=550, key=_request_cache_key, per_instance=True, stale_ttl=60,
+                      negative_ttl=5, negative_exceptions=(RateLimited, Unauthorized), jitter=0.1)
     async def request(self, route: str, token: Optional[str] = None,
                       method: Literal['GET', 'POST'] = 'GET'):
         if self.client_session is None:
             raise ClientSessionNotInitialized
+        if method not in ('GET', 'POST'):
+            raise Exception(
+                'Other HTTP than GET and POST are currently not Supported')
         headers: dict = {}
         if token:
             headers = {'Authorization': f'Bearer {token}'}
-        if method == 'GET':
-            async with self.client_session.get(
-                f'{DISCORD_API_URL}{route}',
-                headers=headers,
-                proxy=self.proxy,
-                proxy_auth=self.proxy_auth,
-            ) as resp:
-                data = await resp.json()
-        elif method == 'POST':
-            async with self.client_session.post(
+
+        async def send():
+            async with self.client_session.request(
+                method,
                 f'{DISCORD_API_URL}{route}',
                 headers=headers,
                 proxy=self.proxy,
                 proxy_auth=self.proxy_auth,
             ) as resp:
-                data = await resp.json()
-        else:
-            raise Exception(
-                'Other HTTP than GET and POST are currently not Supported')
-        if resp.status == 401:
+                return resp.status, resp.headers, await _read_json(resp)
+
+        status, data = await self._rate_limited(f'{method} {route}', token, send)
+        if status == 401:
             raise Unauthorized
-        if resp.status == 429:
-            raise RateLimited(data, resp.headers)
         return data
 
     async def get_token_response(self, payload: PAYLOAD) -> TokenResponse:
         if self.client_session is None:
             raise ClientSessionNotInitialized
-        async with self.client_session.post(
-            DISCORD_TOKEN_URL,
-            data=payload,
-            proxy=self.proxy,
-            proxy_auth=self.proxy_auth,
-        ) as resp:
-            return await resp.json()
+
+        async def send():
+            async with self.client_session.post(
+                DISCORD_TOKEN_URL,
+                data=payload,
+                proxy=self.proxy,
+                proxy_auth=self.proxy_auth,
+            ) as resp:
+                return resp.status, resp.headers, await _read_json(resp)
+
+        _, data = await self._rate_limited('POST /oauth2/token', None, send)
+        return data
+
+    async def _rate_limited(self, route: str, token: Optional[str],
+                            send: Callable[[], Awaitable[tuple[int, Any, Any]]]) -> tuple[int, Any]:
+        """
+            Sends a request once `rate_limiter` lets it through, and retries it after
+            `retry_after` when it's rate limited anyway.
+
+            Returns
+            -------
+            Tuple[int, Any]
+                The status and body of the response
+
+            Raises
+            ------
+            RateLimited
+                If the request is still rate limited after `max_retries` retries
+        """
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(route, token)
+            status, headers, data = await send()
+
+            retry_after = _retry_after(data, headers) if status == 429 else None
+            self.rate_limiter.update(route, token, status, headers, retry_after)
+
+            if status != 429:
+                return status, data
+            if attempt == self.max_retries or retry_after is None:
+                break
+            await asyncio.sleep(retry_after)
+        raise RateLimited(data, headers, retry_after)
 
     async def get_access_token(self, code: str) -> tuple[str, str]:
         payload: TokenGrantPayload = {
@@ -202,14 +349,39 @@ class DiscordOAuthClient:
             raise ScopeMissing('identify')
         route = '/users/@me'
         token = self.get_token(request)
-        return User(**(await self.request(route, token)))
+        return await self._coalesced(route, token, User.model_validate)
 
-    async def guilds(self, request: Request) -> list[GuildPreview]:
+    async def guilds(self, request: Request, preview: bool = False) -> list[GuildPreview]:
+        """
+            Returns the guilds of the user, as `GuildPreview` with only the fields we
+            use if `preview` is set, otherwise as full `Guild`.
+        """
         if 'guilds' not in self.scopes:
             raise ScopeMissing('guilds')
         route = '/users/@me/guilds'
         token = self.get_token(request)
-        return [Guild(**guild) for guild in await self.request(route, token)]
+        adapter: TypeAdapter[list[GuildPreview]] | TypeAdapter[list[Guild]] = \
+            _GUILD_PREVIEWS if preview else _GUILDS
+        return await self._coalesced(route, token, adapter.validate_python)
+
+    async def _coalesced(self, route: str, token: str, parse: Callable[[Any], Any]):
+        """
+            Requests `route` and parses the response once for all concurrent callers
+            with the same route, token and parser, so a burst of identical lookups
+            makes a single upstream request. Unlike the cache of `request`, nothing
+            is kept once the request finished.
+        """
+        key = (route, token, parse)
+        task = self._inflight.get(key)
+        if task is None:
+            async def fetch():
+                return parse(await self.request(route, token))
+
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled caller mustn't cancel the request of the others
+        return await asyncio.shield(task)
 
     def get_token(self, request: Request):
         authorization_header = request.headers.get('Authorization')
@@ -7,16 +7,21 @@ class InvalidRequest(Exception):
 
 
 class RateLimited(Exception):
-    """Raised when a Request is not Valid"""
+    """Raised when a Request is rate limited"""
 
-    def __init__(self, json, headers):
+    def __init__(self, json, headers, retry_after=None):
+        body = json if isinstance(json, dict) else {}
         self.json = json
         self.headers = headers
-        self.message = json['message']
-        self.retry_after = json['retry_after']
+        self.message = body.get('message', 'You are being rate limited.')
+        self.retry_after = body.get('retry_after', retry_after)
         super().__init__(self.message)
 
 
+class ResponseTooLarge(Exception):
+    """Raised when a Response is larger than DISCORD_HTTP_MAX_RESPONSE_SIZE"""
+
+
 class InvalidToken(Exception):
     """Raised when a Response has invalid tokens"""
 
@@ -4,6 +4,10 @@ from app.discord.models.role import Role
 
 
 class GuildPreview(BaseModel):
+    """
+        Only the fields we use of a guild. Cheaper to build than `Guild` for users
+        in hundreds of guilds.
+    """
     id: str
     name: str
     icon: Optional[str] = None
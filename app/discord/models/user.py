@@ -1,5 +1,5 @@
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, computed_field, field_validator
 
 
 class User(BaseModel):
@@ -8,7 +8,6 @@ class User(BaseModel):
     discriminator: Optional[int] = None
     global_name: Optional[str] = None
     avatar: Optional[str]
-    avatar_url: Optional[str] = 'https://cdn.discordapp.com/embed/avatars/1.png'
     locale: str
     email: Optional[str] = None
     mfa_enabled: Optional[bool] = None
@@ -20,11 +19,15 @@ class User(BaseModel):
     verified: Optional[bool] = None
     avatar_decoration: Optional[str] = None
 
-    def __init__(self, **data):
-        super().__init__(**data)
+    @field_validator('discriminator')
+    @classmethod
+    def discriminator_zero_is_none(cls, v: Optional[int]) -> Optional[int]:
+        # Users migrated to unique usernames have the discriminator 0
+        return v or None
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def avatar_url(self) -> str:
         if self.avatar:
-            self.avatar_url = f'https://cdn.discordapp.com/avatars/{self.id}/{self.avatar}.png'
-        else:
-            self.avatar_url = 'https://cdn.discordapp.com/embed/avatars/1.png'
-        if self.discriminator == 0:
-            self.discriminator = None
+            return f'https://cdn.discordapp.com/avatars/{self.id}/{self.avatar}.png'
+        return 'https://cdn.discordapp.com/embed/avatars/1.png'
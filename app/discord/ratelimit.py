@@ -0,0 +1,129 @@
+import time
+import asyncio
+import hashlib
+
+from typing import Mapping, Optional
+
+# Drop buckets that are past their reset once there are this many
+MAX_BUCKETS = 10_000
+
+
+class Bucket:
+    """
+        State of one Discord rate limit bucket, from the X-RateLimit-* headers.
+    """
+    __slots__ = ('limit', 'remaining', 'resetAt', 'window', 'lock')
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.resetAt = 0.0
+        # Longest Reset-After seen, used to guess the next reset until a response arrives
+        self.window = 0.0
+        # Waiting requests are let through in order
+        self.lock = asyncio.Lock()
+
+
+class RateLimiter:
+    """
+        Paces requests so they stay within Discord's rate limits instead of running
+        into 429s.
+
+        Discord groups routes into buckets, announced by the `X-RateLimit-Bucket`
+        header, and limits are counted per bucket and token. Before a request is
+        sent, `acquire` takes one of the remaining requests of its bucket, or waits
+        until the bucket resets. Buckets are updated from the headers of every
+        response with `update`. A global rate limit pauses every request.
+    """
+
+    def __init__(self):
+        # Bucket hash of each route, learned from the responses
+        self.routeBuckets: dict[str, str] = {}
+        self.buckets: dict[tuple[str, str], Bucket] = {}
+        self.globalResetAt = 0.0
+
+    async def acquire(self, route: str, token: Optional[str] = None):
+        """
+            Waits until a request to `route` can be sent without being rate limited.
+        """
+        bucket = self._bucket(route, token)
+        if bucket is None:
+            await self._waitGlobal()
+            return
+
+        async with bucket.lock:
+            while True:
+                await self._waitGlobal()
+                now = time.monotonic()
+                if bucket.resetAt <= now:
+                    if bucket.limit is None:
+                        return
+                    bucket.remaining = bucket.limit
+                    bucket.resetAt = now + bucket.window
+                if bucket.remaining is None or bucket.remaining > 0:
+                    if bucket.remaining is not None:
+                        bucket.remaining -= 1
+                    return
+                await asyncio.sleep(bucket.resetAt - now)
+
+    def update(self, route: str, token: Optional[str], status: int,
+               headers: Mapping[str, str], retryAfter: Optional[float] = None):
+        """
+            Updates the buckets from the headers of a response to `route`.
+        """
+        now = time.monotonic()
+        if status == 429 and retryAfter is not None and (
+            headers.get('X-RateLimit-Global') or headers.get('X-RateLimit-Scope') == 'global'
+        ):
+            self.globalResetAt = max(self.globalResetAt, now + retryAfter)
+            return
+
+        bucketHash = headers.get('X-RateLimit-Bucket')
+        if bucketHash is None:
+            return
+        self.routeBuckets[route] = bucketHash
+
+        key = (bucketHash, self._tokenKey(token))
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            if len(self.buckets) >= MAX_BUCKETS:
+                self._prune(now)
+            bucket = self.buckets[key] = Bucket()
+
+        try:
+            if 'X-RateLimit-Limit' in headers:
+                bucket.limit = int(headers['X-RateLimit-Limit'])
+            if 'X-RateLimit-Remaining' in headers:
+                bucket.remaining = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Reset-After' in headers:
+                resetAfter = float(headers['X-RateLimit-Reset-After'])
+                bucket.resetAt = now + resetAfter
+                bucket.window = max(bucket.window, resetAfter)
+        except ValueError:
+            return
+
+        if status == 429:
+            bucket.remaining = 0
+            if retryAfter is not None:
+                bucket.resetAt = max(bucket.resetAt, now + retryAfter)
+
+    async def _waitGlobal(self):
+        while (delay := self.globalResetAt - time.monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+    def _bucket(self, route: str, token: Optional[str]) -> Optional[Bucket]:
+        bucketHash = self.routeBuckets.get(route)
+        if bucketHash is None:
+            return None
+        return self.buckets.get((bucketHash, self._tokenKey(token)))
+
+    def _prune(self, now: float):
+        for key in [key for key, bucket in self.buckets.items() if bucket.resetAt <= now]:
+            del self.buckets[key]
+
+    @staticmethod
+    def _tokenKey(token: Optional[str]) -> str:
+        if not token:
+            return ''
+        # Don't keep raw tokens around
+        return hashlib.blake2b(token.encode('utf-8'), digest_size=8).hexdigest()
@@ -1,4 +1,8 @@
 from loguru import logger
+from app.core.config import settings
+
+# Id of each log file handler, by log name
+HANDLERS: dict[str, int] = {}
 
 
 def setup_logging():
@@ -10,26 +14,30 @@ def setup_logging():
         '<level>{message}</level>'
     )
 
-    # General logs
-    logger.add(
+    # General logs. If the queue is full, INFO logs are dropped instead of waiting for the disk
+    HANDLERS['server'] = logger.add(
         'logs/server.log',
         rotation='10 MB',
         retention='30 days',
         level='INFO',  # INFO logs will log everything from INFO and above (WARNING, ERROR, etc.)
         format=log_format,
-        enqueue=True,
-        filter=lambda record: not bool(record['exception']),
+        enqueue='thread',  # Each worker writes its own logs, no need to pickle the records
+        queue_maxsize=settings.LOG_QUEUE_MAXSIZE,
+        queue_overflow='drop-below-level',
+        queue_overflow_level='WARNING',
+        exceptions=False,  # Exceptions go to the exception logs
     )
 
     # Exception logs
-    logger.add(
+    HANDLERS['exceptions'] = logger.add(
         'logs/exceptions.log',
         rotation='10 MB',
         retention='30 days',
         level='ERROR',  # ERROR will only log errors
         format=log_format,
-        enqueue=True,
+        enqueue='thread',  # Each worker writes its own logs, no need to pickle the records
+        queue_maxsize=settings.LOG_QUEUE_MAXSIZE,
         backtrace=True,
         diagnose=True,
-        filter=lambda record: bool(record['exception']),
+        exceptions=True,
     )
@@ -0,0 +1,41 @@
+from typing import Iterator
+from loguru import logger
+from prometheus_client.registry import REGISTRY, Collector
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from app.log.setup import HANDLERS
+
+
+class LogQueueCollector(Collector):
+    """
+    Exports the queue state of the log file handlers to Prometheus.
+    """
+
+    def collect(self) -> Iterator:
+        size = GaugeMetricFamily('log_queue_size', 'Log messages waiting to be written.',
+                                 labels=['log'])
+        maxsize = GaugeMetricFamily('log_queue_maxsize', 'Maximum number of waiting log messages.',
+                                    labels=['log'])
+        dropped = CounterMetricFamily('log_dropped_messages',
+                                      'Log messages dropped because the queue was full.',
+                                      labels=['log'])
+
+        queues = logger.queue_stats()
+        for name, handlerId in HANDLERS.items():
+            stats = queues.get(handlerId)
+            if stats is None:
+                continue
+            labels = [name]
+            size.add_metric(labels, stats.size)
+            if stats.maxsize is not None:
+                maxsize.add_metric(labels, stats.maxsize)
+            dropped.add_metric(labels, stats.dropped)
+
+        yield from (size, maxsize, dropped)
+
+
+def registerLogMetrics():
+    """
+    Exports the queue size and dropped messages of the log files.
+    """
+    REGISTRY.register(LogQueueCollector())
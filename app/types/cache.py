@@ -8,6 +8,7 @@ class RedisTokenPrefix:
     collisions with other keys in Redis.
     """
     USER = 'user'
+    CACHE = 'cache'
 
 
 class UserKey:
@@ -15,3 +16,10 @@ class UserKey:
     Keys used to store user data in Redis.
     """
     NONCE = 'nonce'
+
+
+class RedisChannel:
+    """
+    Redis pub/sub channels.
+    """
+    NONCE_INVALIDATION = 'nonce-invalidation'
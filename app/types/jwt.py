@@ -1,11 +1,14 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class JWTPayload(BaseModel):
     """
-        The payload of a JWT token.
+        The payload of a JWT token. Frozen because verified payloads are cached
+        and shared between requests.
     """
+    model_config = ConfigDict(frozen=True)
+
     # Subject
     sub: str
     # Expiration
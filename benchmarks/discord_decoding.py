@@ -0,0 +1,75 @@
+"""
+Compares ways of decoding a large Discord guild list into models.
+
+    python -m benchmarks.discord_decoding [guilds] [iterations]
+
+The fixture is a `/users/@me/guilds` response with roles, for a user in many guilds.
+"""
+import sys
+import json
+import time
+import orjson
+
+from typing import Callable
+from pydantic import TypeAdapter
+from app.discord.models.guild import Guild, GuildPreview
+
+GUILDS = TypeAdapter(list[Guild])
+GUILD_PREVIEWS = TypeAdapter(list[GuildPreview])
+
+
+def _fixture(guilds: int) -> bytes:
+    return orjson.dumps([
+        {
+            'id': str(10**17 + i),
+            'name': f'Guild {i}',
+            'icon': 'a_' + '0' * 30,
+            'owner': i % 10 == 0,
+            'permissions': '2147483647',
+            'features': ['COMMUNITY', 'NEWS', 'INVITE_SPLASH', 'VANITY_URL'],
+            'owner_id': 10**17 + i,
+            'verification_level': 1,
+            'default_message_notifications': 0,
+            'roles': [
+                {
+                    'id': 10**17 + j,
+                    'name': f'Role {j}',
+                    'color': 0,
+                    'position': j,
+                    'permissions': 104324673,
+                    'managed': False,
+                    'mentionable': True,
+                }
+                for j in range(20)
+            ],
+        }
+        for i in range(guilds)
+    ])
+
+
+def _perSecond(fn: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main(guilds: int, iterations: int):
+    body = _fixture(guilds)
+    variants = {
+        'json + Guild(**)': lambda: [Guild(**guild) for guild in json.loads(body)],
+        'orjson + Guild': lambda: GUILDS.validate_python(orjson.loads(body)),
+        'orjson + GuildPreview': lambda: GUILD_PREVIEWS.validate_python(orjson.loads(body)),
+    }
+
+    print(f'{guilds} guilds, {len(body) / 1024:.0f} KiB')
+    print(f'{"decoding":<24}{"lists/s":>12}')
+    for name, fn in variants.items():
+        print(f'{name:<24}{_perSecond(fn, iterations):>12,.0f}')
+
+
+if __name__ == '__main__':
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 200,
+    )
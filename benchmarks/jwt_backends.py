@@ -0,0 +1,43 @@
+"""
+Compares token creation and verification throughput of the JWT backends.
+
+    python -m benchmarks.jwt_backends [iterations]
+
+Backends whose library isn't installed are skipped.
+"""
+import sys
+import time
+
+from typing import Callable
+from app.auth.jwt_backend import BACKENDS
+
+KEY = 'benchmark-secret-key'
+
+
+def _tokensPerSecond(fn: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main(iterations: int):
+    now = int(time.time())
+    claims = {'sub': '123456789', 'iat': now, 'exp': now + 60 * 30, 'nonce': '0' * 32}
+
+    print(f'{"backend":<10}{"create/s":>14}{"verify/s":>14}')
+    for name, backendClass in BACKENDS.items():
+        try:
+            backend = backendClass()
+        except ImportError as e:
+            print(f'{name:<10}skipped ({e})')
+            continue
+
+        token = backend.encode(claims, KEY)
+        create = _tokensPerSecond(lambda: backend.encode(claims, KEY), iterations)
+        verify = _tokensPerSecond(lambda: backend.decode(token, KEY), iterations)
+        print(f'{name:<10}{create:>14,.0f}{verify:>14,.0f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000)
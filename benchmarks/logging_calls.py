@@ -0,0 +1,54 @@
+"""
+Measures the cost of `logger.info` calls with the format of the log files.
+
+    python -m benchmarks.logging_calls [calls]
+
+The sink is the null device, so the numbers are the overhead of building, formatting and
+dispatching the records. The "record only" case filters every record out, so it only measures
+building them.
+"""
+import os
+import sys
+import time
+
+from typing import Any
+from loguru import logger
+
+FORMAT = (
+    '<green>{time:YYYY-MM-DD HH:mm:ss!UTC}</green> | '
+    '<level>{level: <8}</level> | '
+    '<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - '
+    '<level>{message}</level>'
+)
+
+
+def _callsPerSecond(calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        logger.info('Request {} handled', i)
+    return calls / (time.perf_counter() - start)
+
+
+def main(calls: int):
+    logger.remove()
+    cases: dict[str, list[dict[str, Any]]] = {
+        'record only': [{'filter': lambda record: False}],
+        'one sink': [{}],
+        'two sinks': [
+            {'exceptions': False},
+            {'level': 'ERROR', 'exceptions': True},
+        ],
+        'with thread': [{'format': FORMAT + ' ({thread.name})'}],
+    }
+
+    print(f'{"handlers":<14}{"calls/s":>12}')
+    for name, handlers in cases.items():
+        ids = [logger.add(os.devnull, **{'format': FORMAT, **options})
+               for options in handlers]
+        print(f'{name:<14}{_callsPerSecond(calls):>12,.0f}')
+        for handlerId in ids:
+            logger.remove(handlerId)
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
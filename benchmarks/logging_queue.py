@@ -0,0 +1,42 @@
+"""
+Compares the throughput of the queues used by enqueued loguru handlers.
+
+    python -m benchmarks.logging_queue [records]
+
+Each mode logs the records to a temporary file, and the time includes waiting for the writer
+thread to write all of them.
+"""
+import os
+import sys
+import time
+import tempfile
+
+from loguru import logger
+
+FORMAT = '{time:YYYY-MM-DD HH:mm:ss!UTC} | {level: <8} | {name}:{function}:{line} - {message}'
+MODES = {'multiprocessing': True, 'thread': 'thread'}
+
+
+def _recordsPerSecond(path: str, enqueue, records: int) -> float:
+    handlerId = logger.add(path, format=FORMAT, enqueue=enqueue)
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info('Request {} handled', i)
+    logger.complete()
+    elapsed = time.perf_counter() - start
+    logger.remove(handlerId)
+    return records / elapsed
+
+
+def main(records: int):
+    logger.remove()
+
+    print(f'{"enqueue":<18}{"records/s":>12}')
+    with tempfile.TemporaryDirectory() as directory:
+        for name, enqueue in MODES.items():
+            path = os.path.join(directory, f'{name}.log')
+            print(f'{name:<18}{_recordsPerSecond(path, enqueue, records):>12,.0f}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,108 @@
+"""
+Measures the per-request overhead of the error handling middleware stack, comparing
+the previous `BaseHTTPMiddleware` implementation with the pure ASGI one.
+
+    python -m benchmarks.middleware [requests]
+
+Requests are sent straight to the ASGI app, so the numbers exclude the server.
+"""
+import sys
+import time
+import asyncio
+
+from typing import Callable
+from starlette.routing import Route
+from starlette.requests import Request
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api.middleware import CatchAllMiddleware, DBExceptionsMiddleware, ProfilingMiddleware
+
+
+class _PassThroughHTTPMiddleware(BaseHTTPMiddleware):
+    """
+    Stand-in for the previous middlewares, which wrapped call_next in a try block.
+    """
+    async def dispatch(self, request: Request, call_next: Callable):
+        try:
+            return await call_next(request)
+        except Exception:
+            raise
+
+
+async def _endpoint(request: Request) -> PlainTextResponse:
+    return PlainTextResponse('ok')
+
+
+def _app(middleware: list[Middleware]) -> ASGIApp:
+    return Starlette(routes=[Route('/', _endpoint)], middleware=middleware)
+
+
+async def _requestsPerSecond(app: ASGIApp, requests: int) -> float:
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': '/',
+        'raw_path': b'/',
+        'root_path': '',
+        'query_string': b'',
+        'headers': [],
+        'client': ('127.0.0.1', 1234),
+        'server': ('127.0.0.1', 8000),
+    }
+
+    async def request():
+        # Like a real server, report the disconnect only once the response is sent
+        bodySent = False
+        responseComplete = asyncio.Event()
+
+        async def receive() -> Message:
+            nonlocal bodySent
+            if not bodySent:
+                bodySent = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await responseComplete.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message: Message):
+            if message['type'] == 'http.response.body' and not message.get('more_body'):
+                responseComplete.set()
+
+        await app(dict(scope), receive, send)
+
+    start = time.perf_counter()
+    for _ in range(requests):
+        await request()
+    return requests / (time.perf_counter() - start)
+
+
+async def main(requests: int):
+    apps = {
+        'no middleware': _app([]),
+        'BaseHTTPMiddleware x3': _app([Middleware(_PassThroughHTTPMiddleware)] * 3),
+        'pure ASGI x3': _app([
+            Middleware(ProfilingMiddleware),
+            Middleware(CatchAllMiddleware),
+            Middleware(DBExceptionsMiddleware),
+        ]),
+    }
+
+    baseline = 0.0
+    for name, app in apps.items():
+        # Warm up
+        await _requestsPerSecond(app, 100)
+        rate = await _requestsPerSecond(app, requests)
+        perRequest = 1_000_000 / rate
+        if not baseline:
+            baseline = perRequest
+        print(f'{name:<24}{rate:>12,.0f} req/s  {perRequest - baseline:>8.1f} us overhead')
+
+
+if __name__ == '__main__':
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000))
@@ -32,6 +32,21 @@ keepalive = 120
 errorlog = '-'
 timeout = 600
 
+
+def on_starting(server):
+    """
+    Runs once in the master before the workers are forked, so the schema is checked
+    once per deployment instead of once per worker.
+    """
+    from app.db.schema import SCHEMA_CHECKED_ENV, checkSchema
+    from app.db.connection import mysqlEngine
+
+    checkSchema()
+    os.environ[SCHEMA_CHECKED_ENV] = '1'
+    # Don't hand open connections to the forked workers
+    mysqlEngine.dispose()
+
+
 # For debugging and testing
 log_data = {
     'loglevel': loglevel,
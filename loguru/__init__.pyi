@@ -130,9 +130,9 @@ else:
     from typing_extensions import ContextManager
 
 if sys.version_info >= (3, 8):
-    from typing import Protocol, TypedDict
+    from typing import Literal, Protocol, TypedDict
 else:
-    from typing_extensions import Protocol, TypedDict
+    from typing_extensions import Literal, Protocol, TypedDict
 
 _T = TypeVar("_T")
 _F = TypeVar("_F", bound=Callable[..., Any])
@@ -212,6 +212,13 @@ RotationFunction = Callable[[Message, TextIO], bool]
 RetentionFunction = Callable[[List[str]], None]
 CompressionFunction = Callable[[str], None]
 
+_QueueOverflow = Literal["block", "drop-newest", "drop-oldest", "drop-below-level"]
+
+class QueueStats(NamedTuple):
+    size: int
+    maxsize: Optional[int]
+    dropped: int
+
 # Actually unusable because TypedDict can't allow extra keys: python/mypy#4617
 class _HandlerConfig(TypedDict, total=False):
     sink: Union[str, PathLikeStr, TextIO, Writable, Callable[[Message], None], Handler]
@@ -222,8 +229,14 @@ class _HandlerConfig(TypedDict, total=False):
     serialize: bool
     backtrace: bool
     diagnose: bool
-    enqueue: bool
+    enqueue: Union[bool, Literal["thread"]]
     catch: bool
+    batch_size: int
+    batch_latency: float
+    queue_maxsize: Optional[int]
+    queue_overflow: _QueueOverflow
+    queue_overflow_level: Union[str, int]
+    exceptions: Optional[bool]
 
 class LevelConfig(TypedDict, total=False):
     name: str
@@ -246,9 +259,15 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, Literal["thread"]] = ...,
         context: Optional[Union[str, BaseContext]] = ...,
-        catch: bool = ...
+        catch: bool = ...,
+        batch_size: int = ...,
+        batch_latency: float = ...,
+        queue_maxsize: Optional[int] = ...,
+        queue_overflow: _QueueOverflow = ...,
+        queue_overflow_level: Union[str, int] = ...,
+        exceptions: Optional[bool] = ...
     ) -> int: ...
     @overload
     def add(
@@ -262,9 +281,15 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, Literal["thread"]] = ...,
         context: Optional[Union[str, BaseContext]] = ...,
         catch: bool = ...,
+        batch_size: int = ...,
+        batch_latency: float = ...,
+        queue_maxsize: Optional[int] = ...,
+        queue_overflow: _QueueOverflow = ...,
+        queue_overflow_level: Union[str, int] = ...,
+        exceptions: Optional[bool] = ...,
         loop: Optional[AbstractEventLoop] = ...
     ) -> int: ...
     @overload
@@ -279,9 +304,15 @@ class Logger:
         serialize: bool = ...,
         backtrace: bool = ...,
         diagnose: bool = ...,
-        enqueue: bool = ...,
+        enqueue: Union[bool, Literal["thread"]] = ...,
         context: Optional[Union[str, BaseContext]] = ...,
         catch: bool = ...,
+        batch_size: int = ...,
+        batch_latency: float = ...,
+        queue_maxsize: Optional[int] = ...,
+        queue_overflow: _QueueOverflow = ...,
+        queue_overflow_level: Union[str, int] = ...,
+        exceptions: Optional[bool] = ...,
         rotation: Optional[Union[str, int, time, timedelta, RotationFunction]] = ...,
         retention: Optional[Union[str, int, timedelta, RetentionFunction]] = ...,
         compression: Optional[Union[str, CompressionFunction]] = ...,
@@ -294,6 +325,7 @@ class Logger:
     ) -> int: ...
     def remove(self, handler_id: Optional[int] = ...) -> None: ...
     def complete(self) -> AwaitableCompleter: ...
+    def queue_stats(self) -> Dict[int, QueueStats]: ...
     @overload
     def catch(
         self,
@@ -0,0 +1,65 @@
+import collections
+import queue
+import threading
+
+OVERFLOW_POLICIES = ("block", "drop-newest", "drop-oldest", "drop-below-level")
+
+
+class BoundedQueue:
+    """In-process queue of "enqueue='thread'" handlers which holds at most "maxsize" messages.
+
+    Once full, the overflow policy decides what happens to a new message: "block" waits until the
+    writer made room, "drop-newest" discards the new message, "drop-oldest" discards the oldest
+    waiting one and "drop-below-level" discards the new message if its level is below "levelno"
+    (and blocks otherwise). The stop and confirmation signals are never dropped nor blocked.
+    """
+
+    def __init__(self, maxsize, overflow, levelno):
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self._levelno = levelno
+        self._messages = collections.deque()
+        self._mutex = threading.Lock()
+        self._not_empty = threading.Condition(self._mutex)
+        self._not_full = threading.Condition(self._mutex)
+        self.dropped = 0
+
+    def put(self, message):
+        with self._mutex:
+            if isinstance(message, str) and len(self._messages) >= self._maxsize:
+                overflow = self._overflow
+                if overflow == "drop-below-level" and message.record["level"].no < self._levelno:
+                    overflow = "drop-newest"
+
+                if overflow == "drop-newest":
+                    self.dropped += 1
+                    return
+                elif overflow == "drop-oldest" and self._drop_oldest():
+                    self.dropped += 1
+                else:
+                    while len(self._messages) >= self._maxsize:
+                        self._not_full.wait()
+
+            self._messages.append(message)
+            self._not_empty.notify()
+
+    def get(self, timeout=None):
+        with self._mutex:
+            if not self._not_empty.wait_for(lambda: self._messages, timeout):
+                raise queue.Empty
+            message = self._messages.popleft()
+            self._not_full.notify()
+            return message
+
+    def empty(self):
+        return not self._messages
+
+    def qsize(self):
+        return len(self._messages)
+
+    def _drop_oldest(self):
+        for index, message in enumerate(self._messages):
+            if isinstance(message, str):
+                del self._messages[index]
+                return True
+        return False
@@ -44,6 +44,8 @@ LOGURU_BACKTRACE = env("LOGURU_BACKTRACE", bool, True)
 LOGURU_DIAGNOSE = env("LOGURU_DIAGNOSE", bool, True)
 LOGURU_ENQUEUE = env("LOGURU_ENQUEUE", bool, False)
 LOGURU_CONTEXT = env("LOGURU_CONTEXT", str, None)
+LOGURU_BATCH_SIZE = env("LOGURU_BATCH_SIZE", int, 100)
+LOGURU_BATCH_LATENCY = env("LOGURU_BATCH_LATENCY", int, 0)
 LOGURU_CATCH = env("LOGURU_CATCH", bool, True)
 
 LOGURU_TRACE_NO = env("LOGURU_TRACE_NO", int, 5)
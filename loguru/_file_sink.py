@@ -205,6 +205,12 @@ class FileSink:
 
         self._file.write(message)
 
+    def write_many(self, messages):
+        # The rotation is checked once for the whole batch, using the record of the last message
+        batch = type(messages[-1])("".join(messages))
+        batch.record = messages[-1].record
+        self.write(batch)
+
     def stop(self):
         if self._watch:
             self._reopen_if_needed()
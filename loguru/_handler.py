@@ -2,10 +2,15 @@ import functools
 import json
 import multiprocessing
 import os
+import queue
 import threading
+import time
+import weakref
+from collections import namedtuple
 from contextlib import contextmanager
 from threading import Thread
 
+from ._bounded_queue import BoundedQueue
 from ._colorizer import Colorizer
 from ._locks_machinery import create_handler_lock
 
@@ -24,10 +29,27 @@ def memoize(function):
     return functools.lru_cache(maxsize=64)(function)
 
 
+# Handlers with "enqueue='thread'" need a new writer thread in forked child processes, because
+# only the thread calling "fork()" survives in the child.
+thread_queued_handlers = weakref.WeakSet()
+
+
+def restart_thread_writers():
+    for handler in list(thread_queued_handlers):
+        handler._start_thread_writer()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=restart_thread_writers)
+
+
 class Message(str):
     __slots__ = ("record",)
 
 
+QueueStats = namedtuple("QueueStats", ["size", "maxsize", "dropped"])
+
+
 class Handler:
     def __init__(
         self,
@@ -42,6 +64,12 @@ class Handler:
         serialize,
         enqueue,
         multiprocessing_context,
+        batch_size,
+        batch_latency,
+        queue_maxsize,
+        queue_overflow,
+        queue_overflow_levelno,
+        exceptions,
         error_interceptor,
         exception_formatter,
         id_,
@@ -53,10 +81,16 @@ class Handler:
         self._formatter = formatter
         self._is_formatter_dynamic = is_formatter_dynamic
         self._filter = filter_
+        self._exceptions = exceptions
         self._colorize = colorize
         self._serialize = serialize
         self._enqueue = enqueue
         self._multiprocessing_context = multiprocessing_context
+        self._batch_size = batch_size
+        self._batch_latency = batch_latency / 1000
+        self._queue_maxsize = queue_maxsize
+        self._queue_overflow = queue_overflow
+        self._queue_overflow_levelno = queue_overflow_levelno
         self._error_interceptor = error_interceptor
         self._exception_formatter = exception_formatter
         self._id = id_
@@ -88,7 +122,10 @@ class Handler:
             else:
                 self._decolorized_format = self._formatter.strip()
 
-        if self._enqueue:
+        if self._enqueue == "thread":
+            self._start_thread_writer()
+            thread_queued_handlers.add(self)
+        elif self._enqueue:
             if self._multiprocessing_context is None:
                 self._queue = multiprocessing.SimpleQueue()
                 self._confirmation_event = multiprocessing.Event()
@@ -107,6 +144,29 @@ class Handler:
     def __repr__(self):
         return "(id=%d, level=%d, sink=%s)" % (self._id, self._levelno, self._name)
 
+    def _start_thread_writer(self):
+        """Start the writer of "enqueue='thread'", whose queue only lives in this process.
+
+        Messages are handed to the writer thread as they are, without being pickled. This is
+        also called in forked child processes, where the writer thread of the parent is gone.
+        """
+        if self._stopped:
+            return
+        if self._queue_maxsize is None:
+            self._queue = queue.SimpleQueue()
+        else:
+            self._queue = BoundedQueue(
+                self._queue_maxsize, self._queue_overflow, self._queue_overflow_levelno
+            )
+        self._confirmation_event = threading.Event()
+        self._confirmation_lock = threading.Lock()
+        self._queue_lock = create_handler_lock()
+        self._owner_process_pid = os.getpid()
+        self._thread = Thread(
+            target=self._queued_writer, daemon=True, name="loguru-writer-%d" % self._id
+        )
+        self._thread.start()
+
     @contextmanager
     def _protected_lock(self):
         """Acquire the lock, but fail fast if its already acquired by the current thread."""
@@ -129,6 +189,10 @@ class Handler:
             if self._levelno > record["level"].no:
                 return
 
+            if self._exceptions is not None:
+                if self._exceptions is not bool(record["exception"]):
+                    return
+
             if self._filter is not None:
                 if not self._filter(record):
                     return
@@ -248,6 +312,13 @@ class Handler:
     def levelno(self):
         return self._levelno
 
+    def queue_stats(self):
+        if self._enqueue != "thread":
+            return None
+        return QueueStats(
+            self._queue.qsize(), self._queue_maxsize, getattr(self._queue, "dropped", 0)
+        )
+
     @staticmethod
     def _serialize_record(text, record):
         exception = record["exception"]
@@ -289,7 +360,7 @@ class Handler:
 
     def _queued_writer(self):
         message = None
-        queue = self._queue
+        queue_ = self._queue
 
         # We need to use a lock to protect sink during fork.
         # Particularly, writing to stderr may lead to deadlock in child process.
@@ -297,7 +368,7 @@ class Handler:
 
         while True:
             try:
-                message = queue.get()
+                message = queue_.get()
             except Exception:
                 with lock:
                     self._error_interceptor.print(None)
@@ -310,18 +381,83 @@ class Handler:
                 self._confirmation_event.set()
                 continue
 
+            # Drain the messages already waiting (or arriving within the latency) to write them
+            # at once, the stop and confirmation signals are handled after the batch is written.
+            batch, message = self._next_batch(queue_, message)
+
             with lock:
-                try:
-                    self._sink.write(message)
-                except Exception:
-                    self._error_interceptor.print(message.record)
+                self._write_batch(batch)
+
+            if message is None:
+                break
+
+            if message is True:
+                self._confirmation_event.set()
+
+    def _next_batch(self, queue_, message):
+        batch = [message]
+        deadline = None
+
+        while len(batch) < self._batch_size:
+            timeout = None
+            if queue_.empty():
+                if self._batch_latency <= 0:
+                    break
+                if deadline is None:
+                    deadline = time.monotonic() + self._batch_latency
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                if self._enqueue != "thread":
+                    # The multiprocessing queue can't wait with a timeout
+                    time.sleep(min(timeout, 0.001))
+                    continue
+
+            try:
+                message = queue_.get(timeout=timeout) if timeout else queue_.get()
+            except queue.Empty:
+                break
+            except Exception:
+                with self._queue_lock:
+                    self._error_interceptor.print(None)
+                continue
+
+            if message is None or message is True:
+                return batch, message
+
+            batch.append(message)
+
+        return batch, False
+
+    def _write_batch(self, batch):
+        write_many = getattr(self._sink, "write_many", None)
+
+        if len(batch) > 1 and write_many is not None:
+            try:
+                write_many(batch)
+            except Exception:
+                self._error_interceptor.print(batch[0].record)
+            return
+
+        for message in batch:
+            try:
+                self._sink.write(message)
+            except Exception:
+                self._error_interceptor.print(message.record)
 
     def __getstate__(self):
         state = self.__dict__.copy()
         state["_lock"] = None
         state["_lock_acquired"] = None
         state["_memoize_dynamic_format"] = None
-        if self._enqueue:
+        if self._enqueue == "thread":
+            # The queue can't leave this process, the unpickled handler starts its own writer
+            state["_queue"] = None
+            state["_thread"] = None
+            state["_queue_lock"] = None
+            state["_confirmation_event"] = None
+            state["_confirmation_lock"] = None
+        elif self._enqueue:
             state["_sink"] = None
             state["_thread"] = None
             state["_owner_process"] = None
@@ -332,7 +468,10 @@ class Handler:
         self.__dict__.update(state)
         self._lock = create_handler_lock()
         self._lock_acquired = threading.local()
-        if self._enqueue:
+        if self._enqueue == "thread":
+            self._start_thread_writer()
+            thread_queued_handlers.add(self)
+        elif self._enqueue:
             self._queue_lock = create_handler_lock()
         if self._is_formatter_dynamic:
             if self._colorize:
@@ -6,6 +6,7 @@
 .. |add| replace:: :meth:`~Logger.add()`
 .. |remove| replace:: :meth:`~Logger.remove()`
 .. |complete| replace:: :meth:`~Logger.complete()`
+.. |queue_stats| replace:: :meth:`~Logger.queue_stats()`
 .. |catch| replace:: :meth:`~Logger.catch()`
 .. |bind| replace:: :meth:`~Logger.bind()`
 .. |contextualize| replace:: :meth:`~Logger.contextualize()`
@@ -94,11 +95,13 @@ from collections import namedtuple
 from inspect import isclass, iscoroutinefunction, isgeneratorfunction
 from multiprocessing import current_process, get_context
 from multiprocessing.context import BaseContext
+from os import getpid
 from os.path import basename, splitext
-from threading import current_thread
+from threading import current_thread, get_ident
 
 from . import _asyncio_loop, _colorama, _defaults, _filters
 from ._better_exceptions import ExceptionFormatter
+from ._bounded_queue import OVERFLOW_POLICIES
 from ._colorizer import Colorizer
 from ._contextvars import ContextVar
 from ._datetime import aware_now
@@ -122,6 +125,9 @@ start_time = aware_now()
 
 context = ContextVar("loguru_context", default={})
 
+# File name and module name of each source file, to avoid splitting its path on every call
+file_names = {}
+
 
 class Core:
     def __init__(self):
@@ -249,6 +255,12 @@ class Logger:
         enqueue=_defaults.LOGURU_ENQUEUE,
         context=_defaults.LOGURU_CONTEXT,
         catch=_defaults.LOGURU_CATCH,
+        batch_size=_defaults.LOGURU_BATCH_SIZE,
+        batch_latency=_defaults.LOGURU_BATCH_LATENCY,
+        queue_maxsize=None,
+        queue_overflow="block",
+        queue_overflow_level="WARNING",
+        exceptions=None,
         **kwargs
     ):
         r"""Add a handler sending log messages to a sink adequately configured.
@@ -278,10 +290,13 @@ class Logger:
         diagnose : |bool|, optional
             Whether the exception trace should display the variables values to eases the debugging.
             This should be set to ``False`` in production to avoid leaking sensitive data.
-        enqueue : |bool|, optional
+        enqueue : |bool| or |str|, optional
             Whether the messages to be logged should first pass through a multiprocessing-safe queue
             before reaching the sink. This is useful while logging to a file through multiple
-            processes. This also has the advantage of making logging calls non-blocking.
+            processes. This also has the advantage of making logging calls non-blocking. If
+            ``"thread"``, the messages pass through a queue which only lives in the current process
+            instead, they are handed to the writer thread without being pickled. Forked child
+            processes get their own queue and writer thread.
         context : |multiprocessing.Context| or |str|, optional
             A context object or name that will be used for all tasks involving internally the
             |multiprocessing| module, in particular when ``enqueue=True``. If ``None``, the default
@@ -290,6 +305,30 @@ class Logger:
             Whether errors occurring while sink handles logs messages should be automatically
             caught. If ``True``, an exception message is displayed on |sys.stderr| but the exception
             is not propagated to the caller, preventing your app to crash.
+        batch_size : |int|, optional
+            The maximum number of enqueued messages written to the sink at once when
+            ``enqueue=True``. Messages waiting in the queue are joined and written with a single
+            call, which avoids one lock acquisition and one ``write()`` per message.
+        batch_latency : |int|, optional
+            How many milliseconds the writer waits for more messages to fill a batch when
+            ``enqueue=True``. If ``0``, only the messages already waiting are batched, so no
+            latency is added.
+        queue_maxsize : |int|, optional
+            The maximum number of messages waiting in the queue when ``enqueue="thread"``. If
+            ``None``, the queue is unbounded. The multiprocessing queue of ``enqueue=True`` is
+            always bounded by the size of its pipe and blocks once it's full.
+        queue_overflow : |str|, optional
+            What to do with a message once the queue holds ``queue_maxsize`` messages: ``"block"``
+            waits until the writer made room, ``"drop-newest"`` discards the new message,
+            ``"drop-oldest"`` discards the oldest waiting message and ``"drop-below-level"``
+            discards the new message if its level is below ``queue_overflow_level``, and blocks
+            otherwise. Dropped messages are counted, see |queue_stats|.
+        queue_overflow_level : |int| or |str|, optional
+            The level from which messages are never dropped with ``"drop-below-level"``.
+        exceptions : |bool|, optional
+            If ``True``, only the messages logged with an exception are sent to the sink, if
+            ``False`` only the messages without one. This is checked before the ``filter``, at the
+            cost of an attribute lookup instead of a function call. If ``None``, both are sent.
         **kwargs
             Additional parameters that are only valid to configure a coroutine or file sink (see
             below).
@@ -968,6 +1007,70 @@ class Logger:
         if not isinstance(encoding, str):
             encoding = "ascii"
 
+        if isinstance(enqueue, str) and enqueue != "thread":
+            raise ValueError(
+                "Invalid enqueue value, it should be a boolean or 'thread', not: '%s'" % enqueue
+            )
+
+        if not isinstance(batch_size, int) or isinstance(batch_size, bool):
+            raise TypeError(
+                "Invalid batch_size, it should be an integer, not: '%s'" % type(batch_size).__name__
+            )
+
+        if batch_size < 1:
+            raise ValueError(
+                "Invalid batch_size value, it should be a strictly positive integer, not: %d"
+                % batch_size
+            )
+
+        if not isinstance(batch_latency, (int, float)) or isinstance(batch_latency, bool):
+            raise TypeError(
+                "Invalid batch_latency, it should be a number of milliseconds, not: '%s'"
+                % type(batch_latency).__name__
+            )
+
+        if batch_latency < 0:
+            raise ValueError(
+                "Invalid batch_latency value, it should be a positive number, not: %s"
+                % batch_latency
+            )
+
+        if exceptions is not None and not isinstance(exceptions, bool):
+            raise TypeError(
+                "Invalid exceptions, it should be a boolean or None, not: '%s'"
+                % type(exceptions).__name__
+            )
+
+        if queue_maxsize is not None:
+            if enqueue != "thread":
+                raise ValueError("The 'queue_maxsize' option requires 'enqueue=\"thread\"'")
+            if not isinstance(queue_maxsize, int) or isinstance(queue_maxsize, bool):
+                raise TypeError(
+                    "Invalid queue_maxsize, it should be an integer, not: '%s'"
+                    % type(queue_maxsize).__name__
+                )
+            if queue_maxsize < 1:
+                raise ValueError(
+                    "Invalid queue_maxsize value, it should be a strictly positive integer, "
+                    "not: %d" % queue_maxsize
+                )
+
+        if queue_overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                "Invalid queue_overflow, it should be one of %s, not: '%s'"
+                % (", ".join("'%s'" % policy for policy in OVERFLOW_POLICIES), queue_overflow)
+            )
+
+        if isinstance(queue_overflow_level, str):
+            queue_overflow_levelno = self.level(queue_overflow_level).no
+        elif isinstance(queue_overflow_level, int):
+            queue_overflow_levelno = queue_overflow_level
+        else:
+            raise TypeError(
+                "Invalid queue_overflow_level, it should be an integer or a string, not: '%s'"
+                % type(queue_overflow_level).__name__
+            )
+
         if isinstance(context, str):
             context = get_context(context)
         elif context is not None and not isinstance(context, BaseContext):
@@ -997,6 +1100,12 @@ class Logger:
                 serialize=serialize,
                 enqueue=enqueue,
                 multiprocessing_context=context,
+                batch_size=batch_size,
+                batch_latency=batch_latency,
+                queue_maxsize=queue_maxsize,
+                queue_overflow=queue_overflow,
+                queue_overflow_levelno=queue_overflow_levelno,
+                exceptions=exceptions,
                 id_=handler_id,
                 error_interceptor=error_interceptor,
                 exception_formatter=exception_formatter,
@@ -1125,6 +1234,29 @@ class Logger:
 
         return AwaitableCompleter()
 
+    def queue_stats(self):
+        """Return the state of the queues of handlers added with ``enqueue="thread"``.
+
+        Returns
+        -------
+        :class:`dict`
+            A dict mapping the id of each of these handlers to a ``QueueStats`` named tuple of
+            ``size`` (messages waiting to be written), ``maxsize`` (``None`` if unbounded) and
+            ``dropped`` (messages discarded by the ``queue_overflow`` policy in this process).
+
+        Examples
+        --------
+        >>> i = logger.add("file.log", enqueue="thread", queue_maxsize=1000)
+        >>> logger.queue_stats()[i]
+        QueueStats(size=0, maxsize=1000, dropped=0)
+        """
+        stats = {}
+        for handler_id, handler in self._core.handlers.items():
+            handler_stats = handler.queue_stats()
+            if handler_stats is not None:
+                stats[handler_id] = handler_stats
+        return stats
+
     def catch(
         self,
         exception=Exception,
@@ -1968,9 +2100,12 @@ class Logger:
 
         code = frame.f_code
         file_path = code.co_filename
-        file_name = basename(file_path)
-        thread = current_thread()
-        process = current_process()
+        try:
+            file_name, module = file_names[file_path]
+        except KeyError:
+            file_name = basename(file_path)
+            module = splitext(file_name)[0]
+            file_names[file_path] = (file_name, module)
         elapsed = current_datetime - start_time
 
         if exception:
@@ -1993,10 +2128,10 @@ class Logger:
             "level": RecordLevel(level_name, level_no, level_icon),
             "line": frame.f_lineno,
             "message": str(message),
-            "module": splitext(file_name)[0],
+            "module": module,
             "name": name,
-            "process": RecordProcess(process.ident, process.name),
-            "thread": RecordThread(thread.ident, thread.name),
+            "process": RecordProcess(getpid(), current_process()),
+            "thread": RecordThread(get_ident(), current_thread()),
             "time": current_datetime,
         }
 
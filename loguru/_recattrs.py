@@ -32,11 +32,32 @@ class RecordFile:
 
 
 class RecordThread:
-    __slots__ = ("id", "name")
+    """The thread of a record, whose name is looked up on first access from the thread object."""
 
-    def __init__(self, id_, name):
+    __slots__ = ("id", "_name", "_thread")
+
+    def __init__(self, id_, thread):
         self.id = id_
-        self.name = name
+        self._thread = thread
+
+    @property
+    def name(self):
+        if self._thread is not None:
+            self._name = self._thread.name
+            self._thread = None
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        self._thread = None
+
+    def __getstate__(self):
+        return self.id, self.name
+
+    def __setstate__(self, state):
+        self.id, self._name = state
+        self._thread = None
 
     def __repr__(self):
         return "(id=%r, name=%r)" % (self.id, self.name)
@@ -46,11 +67,32 @@ class RecordThread:
 
 
 class RecordProcess:
-    __slots__ = ("id", "name")
+    """The process of a record, whose name is looked up on first access from the process object."""
 
-    def __init__(self, id_, name):
+    __slots__ = ("id", "_name", "_process")
+
+    def __init__(self, id_, process):
         self.id = id_
-        self.name = name
+        self._process = process
+
+    @property
+    def name(self):
+        if self._process is not None:
+            self._name = self._process.name
+            self._process = None
+        return self._name
+
+    @name.setter
+    def name(self, name):
+        self._name = name
+        self._process = None
+
+    def __getstate__(self):
+        return self.id, self.name
+
+    def __setstate__(self, state):
+        self.id, self._name = state
+        self._process = None
 
     def __repr__(self):
         return "(id=%r, name=%r)" % (self.id, self.name)
@@ -17,6 +17,11 @@ class StreamSink:
         if self._flushable:
             self._stream.flush()
 
+    def write_many(self, messages):
+        self._stream.write("".join(messages))
+        if self._flushable:
+            self._stream.flush()
+
     def stop(self):
         if self._stoppable:
             self._stream.stop()
@@ -1,22 +1,51 @@
 # uvicorn main:server --reload
+import time
+
+STARTED_AT = time.perf_counter()
+
+import asyncio
 import app.models.mysql
 import app.db.connection
 import app.api.middleware as middleware
 
+from loguru import logger
 from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from app.db.schema import checkSchema
 from app.api.router import apiRouter
 from app.core.config import settings
 from app.log.setup import setup_logging
+from app.db.pool import registerPoolMetrics
+from app.cache.stats import registerCacheMetrics
+from app.log.stats import registerLogMetrics
+from app.discord.client import open_client_session, close_client_session
 from app.types.server import ServerResponse
 from fastapi.responses import ORJSONResponse
 from starlette.middleware.cors import CORSMiddleware
 from prometheus_fastapi_instrumentator import Instrumentator
 
+
+@asynccontextmanager
+async def lifespan(server: FastAPI):
+    # Creates the tables if they dont exist. Runs in the background so the worker
+    # can serve right away, and is skipped if gunicorn already did it before forking
+    schemaCheck = asyncio.create_task(asyncio.to_thread(checkSchema))
+    # One pooled Discord session per worker, shared by every DiscordOAuthClient
+    await open_client_session()
+    logger.info(f'Worker started in {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms')
+
+    yield
+
+    await close_client_session()
+    await schemaCheck
+
+
 server = FastAPI(
     title='fastapi-server',
     debug=settings.DEBUG,
     openapi_url=f'{settings.API_V1_STR}/openapi.json',
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 server.include_router(apiRouter, prefix=settings.API_V1_STR)
 
@@ -26,9 +55,9 @@ setup_logging()
 Instrumentator(
     env_var_name='ENABLE_METRICS',
 ).instrument(server).expose(server)
-
-# Creates the tables if they dont exist
-app.db.connection.createMySQLTables()
+registerPoolMetrics(app.db.connection.mysqlEngine, app.db.connection.mysqlAsyncEngine.sync_engine)
+registerCacheMetrics()
+registerLogMetrics()
 
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS: